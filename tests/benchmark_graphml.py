@@ -0,0 +1,65 @@
+"""
+Compare writing GraphML natively with writing it via networkx.
+
+    python tests/benchmark_graphml.py [nodes] [edges per node]
+
+This is not run as part of the test suite.
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+from travers import Graph
+from travers import read_graphml
+
+
+def build_large_graph(nodes: int, fanout: int):
+    """
+    Create a graph with a given number of nodes and edges per node
+    """
+    g = Graph()
+    for i in range(nodes):
+        g.add_node(f"node-{i}", {"node_type": f"type-{i % 10}", "index": i})
+    for i in range(nodes):
+        for j in range(1, fanout + 1):
+            g.add_edge(f"node-{i}", f"node-{(i * j + 7) % nodes}", f"rel-{j}")
+    return g
+
+
+def measure(label, method, *args):
+    # time and memory are measured in separate runs, tracing slows execution
+    start = time.perf_counter_ns()
+    method(*args)
+    duration = (time.perf_counter_ns() - start) / 1e9
+    tracemalloc.start()
+    method(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {duration:>8.2f}s {peak / 1024 / 1024:>10.1f}MB peak")
+
+
+def write_with_networkx(graph, graphml_file):
+    import networkx as nx  # type:ignore
+
+    nx.write_graphml(graph.to_networkx(), graphml_file)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    NODES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    FANOUT = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    TEST_FILE = "BENCHMARK.graphml"
+
+    graph = build_large_graph(NODES, FANOUT)
+    print(graph)
+
+    measure("travers to_graphml", graph.to_graphml, TEST_FILE)
+    measure("travers read_graphml", read_graphml, TEST_FILE)
+    try:
+        measure("networkx write_graphml", write_with_networkx, graph, TEST_FILE)
+    except ImportError:
+        print("networkx is not installed, skipping")
+
+    os.remove(TEST_FILE)
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from travers import CompactGraph
+from travers.graphs import walk
+from data.graph_data import build_graph, graph_is_as_expected
+
+
+def test_compact_graph():
+    graph = build_graph()
+    compact = graph.compact()
+
+    assert isinstance(compact, CompactGraph)
+    graph_is_as_expected(compact)
+    assert len(compact) == len(graph)
+    assert sorted(compact.edges()) == sorted(graph.edges())
+    assert compact["Bindoon"] == {"node_type": "Locality"}
+    assert compact["Perth"] is None
+
+
+def test_compact_graph_edges():
+    graph = build_graph()
+    compact = graph.compact()
+
+    for nid in graph.nodes():
+        assert sorted(compact.outgoing_edges(nid)) == sorted(graph.outgoing_edges(nid))
+        assert sorted(compact.ingoing_edges(nid)) == sorted(graph.ingoing_edges(nid))
+        assert sorted(compact.outgoing_relationships(nid)) == sorted(
+            graph.outgoing_relationships(nid)
+        )
+
+    assert compact.outgoing_edges("Lainie", "Mother") == [
+        ("Lainie", "Sharlene", "Mother"),
+        ("Lainie", "Ceanne", "Mother"),
+    ]
+    assert compact.outgoing_edges("Lainie", "Sister", "Unknown") == []
+    assert compact.outgoing_edges("Perth") == []
+
+
+def test_compact_graph_search():
+    graph = build_graph()
+    compact = graph.compact()
+
+    assert len(compact.breadth_first_search("Saturn")) == 0
+    assert len(compact.breadth_first_search("Sharlene")) == 15
+    assert len(compact.breadth_first_search("Sharlene", 1)) == 4
+    assert len(compact.breadth_first_search("Sharlene", 2)) == 14
+
+    assert compact.shortest_path("Lainie", "Lainie") == ["Lainie"]
+    assert compact.shortest_path("Lainie", "Bindoon") == ["Lainie", "Sharlene", "Bindoon"]
+    assert compact.shortest_path("Bindoon", "Lainie") == []
+    assert compact.shortest_path("Lainie", "Perth") == []
+
+
+def test_compact_graph_walk():
+    compact = build_graph().compact()
+
+    d_1 = walk(compact, "Lainie")
+    assert sorted(d_1.list_relationships()) == ["Likes", "Lives In", "Mother"]
+
+    d_2 = d_1.follow("Mother")
+    assert sorted(d_2.active_nodes()) == ["Ceanne", "Sharlene"]
+    assert d_2.values("node_type") == ["Person"]
+    assert d_1.follow("Likes", "Lives In", "Mother").has(
+        "node_type", "Locality"
+    ).active_nodes() == {"Toodyay"}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_compact_graph()
+    test_compact_graph_edges()
+    test_compact_graph_search()
+    test_compact_graph_walk()
+
+    print("okay")
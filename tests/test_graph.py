@@ -120,6 +120,38 @@ def test_bfs():
     assert len(bfs) == 14
 
 
+def test_lazy_bfs():
+    graph = build_graph()
+
+    edges = graph.breadth_first_edges("Sharlene")
+    assert next(edges) == graph.outgoing_edges("Sharlene")[0]
+    assert list(graph.breadth_first_edges("Sharlene")) == graph.breadth_first_search("Sharlene")
+
+    # only follow some relationships
+    bfs = list(graph.breadth_first_edges("Lainie", relationships=["Mother", "Sister"]))
+    assert {r for s, t, r in bfs} == {"Mother", "Sister"}
+    assert len(bfs) == 4
+
+    # a string is one relationship, and listing a relationship twice is the same as once
+    assert list(graph.breadth_first_edges("Lainie", relationships="Mother")) == list(
+        graph.breadth_first_edges("Lainie", relationships=["Mother"])
+    )
+    assert list(graph.breadth_first_edges("Lainie", relationships=["Mother", "Mother"])) == list(
+        graph.breadth_first_edges("Lainie", relationships=["Mother"])
+    )
+    assert list(graph.breadth_first_edges("Lainie", relationships="Mother")) != []
+
+    # stop at the first match
+    bfs = list(graph.breadth_first_edges("Sharlene", stop_when=lambda e: e[1] == "Kailis Bros"))
+    assert bfs[-1][1] == "Kailis Bros"
+    assert len(bfs) < 15
+
+    # limit the number of nodes visited
+    bfs = list(graph.breadth_first_edges("Sharlene", max_nodes=3))
+    assert len({s for s, t, r in bfs} | {t for s, t, r in bfs}) == 3
+    assert len(bfs) == 2
+
+
 def test_incoming_edges():
     graph = build_graph()
     incoming = graph.ingoing_edges("Bindoon")
@@ -148,13 +180,139 @@ def test_node_deletion():
     assert ("Sharlene", "Bindoon", "Lives In") not in graph.edges()
 
 
+def test_incoming_edges_after_mutation():
+    graph = build_graph()
+
+    graph.remove_edge("Hungry Jacks", "Bindoon", "Located In")
+    assert graph.ingoing_edges("Bindoon") == [("Sharlene", "Bindoon", "Lives In")]
+
+    graph.insert_node_before("Shire", {"node_type": "Shire"}, "Toodyay")
+    assert graph.ingoing_edges("Toodyay") == [("Shire", "Toodyay", None)]
+    assert sorted(s for s, t, r in graph.ingoing_edges("Shire")) == [
+        "Chicken Treat",
+        "Kailis Bros",
+        "Lainie",
+    ]
+
+    graph.insert_node_after("Fan", {"node_type": "Person"}, "Lainie")
+    assert ("Fan", "Kailis Bros", "Likes") in graph.ingoing_edges("Kailis Bros")
+    assert ("Lainie", "Kailis Bros", "Likes") not in graph.ingoing_edges("Kailis Bros")
+
+    graph.remove_node("Gingin", True)
+    assert graph.ingoing_edges("Gingin") == []
+
+    # the reverse index should always agree with a full scan of the edges
+    for nid in graph.nodes():
+        expected = [(s, t, r) for s, t, r in graph.edges() if t == nid]
+        assert sorted(graph.ingoing_edges(nid), key=str) == sorted(expected, key=str)
+
+
+def test_edge_order_and_deduplication():
+    from travers import Graph
+
+    graph = Graph()
+    for i in range(1000):
+        graph.add_edge("hub", f"spoke{i}", "Spoke")
+    graph.add_edge("hub", "spoke0", "Spoke")
+    graph.add_edge("hub", "spoke0", "Other")
+
+    outgoing = graph.outgoing_edges("hub")
+    assert len(outgoing) == 1001
+    assert outgoing[0] == ("hub", "spoke0", "Spoke")
+    assert outgoing[1] == ("hub", "spoke1", "Spoke")
+    assert outgoing[-1] == ("hub", "spoke0", "Other")
+
+    graph.remove_edge("hub", "spoke1", "Spoke")
+    assert ("hub", "spoke1", "Spoke") not in graph.outgoing_edges("hub")
+    assert len(list(graph.edges())) == 1000
+
+
+def test_outgoing_edges_by_relationship():
+    graph = build_graph()
+
+    assert graph.outgoing_edges("Lainie", "Mother") == [
+        ("Lainie", "Sharlene", "Mother"),
+        ("Lainie", "Ceanne", "Mother"),
+    ]
+    assert graph.outgoing_edges("Lainie", "Sister") == []
+    assert len(graph.outgoing_edges("Lainie", "Mother", "Likes")) == 3
+    assert sorted(graph.outgoing_relationships("Lainie")) == ["Likes", "Lives In", "Mother"]
+
+    graph.remove_edge("Lainie", "Kailis Bros", "Likes")
+    assert sorted(graph.outgoing_relationships("Lainie")) == ["Lives In", "Mother"]
+    assert graph.outgoing_relationships("Saturn") == []
+
+
+def test_deep_depth_first_search():
+    from travers import Graph
+
+    class Step:
+        node_type = "Step"
+
+        def __init__(self, nid):
+            self.nid = nid
+
+        def __str__(self):
+            return f"step {self.nid}"
+
+    graph = Graph()
+    for i in range(5000):
+        graph.add_node(i, Step(i))
+    for i in range(4999):
+        graph.add_edge(i + 1, i, "feeds")
+
+    tree = graph.depth_first_search()
+    for i in range(4999):
+        tree = tree["children"][0]
+        assert tree["relationship"] == "feeds"
+    assert tree["name"] == 4999
+    assert tree["depth"] == 4999
+
+    events = graph.depth_first_events()
+    assert next(events) == (0, 0, None)
+    assert next(events) == (1, 1, "feeds")
+
+    lines = list(graph.draw_lines())
+    assert len(lines) == 5000
+    assert lines[1] == "   └─ step 1\n"
+
+
+def test_draw():
+    from travers import Graph
+
+    class Step:
+        node_type = "Step"
+
+        def __init__(self, nid):
+            self.nid = nid
+
+        def __str__(self):
+            return self.nid
+
+    graph = Graph()
+    for nid in "abcde":
+        graph.add_node(nid, Step(nid))
+    graph.add_edge("b", "a", "feeds")
+    graph.add_edge("c", "a", "feeds")
+    graph.add_edge("d", "b", "feeds")
+    graph.add_edge("e", "c", "feeds")
+
+    assert graph.draw() == "└─ a\n   ├─ b\n   │  └─ d\n   └─ c\n      └─ e\n"
+
+
 if __name__ == "__main__":  # pragma: no cover
     test_graph()
     test_outgoing_edges()
     test_epitomize()
     test_bfs()
+    test_lazy_bfs()
     test_incoming_edges()
     test_node_attributes()
     test_edge_deletion()
     test_node_deletion()
+    test_incoming_edges_after_mutation()
+    test_edge_order_and_deduplication()
+    test_outgoing_edges_by_relationship()
+    test_deep_depth_first_search()
+    test_draw()
     print("okay")
@@ -0,0 +1,127 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from travers import Graph
+from travers.graphs import walk, walk_where
+from data.graph_data import build_graph, graph_is_as_expected
+
+
+def build_columnar_graph():
+    graph = Graph(columnar=True)
+    source = build_graph()
+    for nid, attributes in source.nodes(data=True):
+        graph.add_node(nid, attributes)
+    for s, t, r in source.edges():
+        graph.add_edge(s, t, r)
+    return graph
+
+
+def test_columnar_attributes():
+    graph = build_columnar_graph()
+    graph_is_as_expected(graph)
+
+    assert graph["Lainie"] == {"node_type": "Person"}
+    assert graph["Perth"] is None
+
+    # nodes can be replaced and removed, and other values are kept as they are
+    graph["Lainie"] = {"node_type": "Person", "age": 70}
+    assert graph["Lainie"] == {"node_type": "Person", "age": 70}
+    graph.remove_node("Saturn")
+    graph.add_node("Mars", {"node_type": "Planet", "moons": ["Phobos", "Deimos"]})
+    graph.add_node("Pluto", None)
+    assert graph["Mars"] == {"node_type": "Planet", "moons": ["Phobos", "Deimos"]}
+    assert graph["Pluto"] is None
+    assert "Saturn" not in graph.nodes()
+    assert len(graph) == 11
+
+    d_1 = walk(graph, "Lainie").follow("Likes", "Lives In", "Mother")
+    assert sorted(d_1.has("node_type", "Person").active_nodes()) == ["Ceanne", "Sharlene"]
+
+
+def test_columnar_attribute_types():
+    graph = Graph(columnar=True)
+    values = {"a": 1, "b": True, "c": 1.0, "d": 0.0, "e": False, "f": 0}
+    for nid, value in values.items():
+        graph.add_node(nid, {"x": value})
+
+    # values which are equal but of different types are kept as they are
+    for nid, value in values.items():
+        assert graph[nid] == {"x": value}
+        assert type(graph[nid]["x"]) is type(value)
+
+    # but are still equal when filtering
+    assert walk(graph, list(values)).has("x", 1).active_nodes() == {"a", "b", "c"}
+    assert walk(graph, list(values)).has("x", False).active_nodes() == {"d", "e", "f"}
+
+
+def test_attribute_index():
+    graph = build_graph()
+    graph.index_attribute("node_type")
+
+    assert sorted(graph.find_nodes("node_type", "Locality")) == ["Bindoon", "Gingin", "Toodyay"]
+    assert graph.find_nodes("node_type", "Moon") == []
+
+    # the index is kept up to date
+    graph.add_node("Perth", {"node_type": "Locality"})
+    graph["Toodyay"] = {"node_type": "Town"}
+    graph.remove_node("Bindoon")
+    other = Graph()
+    other.add_node("Gingin", {"node_type": "Town"})
+    graph + other
+    assert sorted(graph.find_nodes("node_type", "Locality")) == ["Perth"]
+    assert sorted(graph.find_nodes("node_type", "Town")) == ["Gingin", "Toodyay"]
+
+    # has uses the index
+    d_1 = walk(graph, "Lainie").follow("Likes", "Lives In", "Mother")
+    assert d_1.has("node_type", "Town").active_nodes() == {"Toodyay"}
+    assert sorted(d_1.has("node_type", "Person").active_nodes()) == ["Ceanne", "Sharlene"]
+
+
+def test_attribute_index_has_matches_scan():
+    graph = Graph()
+    graph.add_node("a", {"k": None})
+    graph.add_node("b", {})
+    graph.add_node("c", {"k": 1})
+
+    # nodes without the attribute match None, with or without the index
+    for indexed in (False, True):
+        if indexed:
+            graph.index_attribute("k")
+        nids = ["a", "b", "c"]
+        assert walk(graph, nids).has("k", None).active_nodes() == {"a", "b"}
+        assert walk(graph, nids).has("k", 1).active_nodes() == {"c"}
+        assert walk(graph, nids, vectorised=True).has("k", None).active_nodes() == {"a", "b"}
+
+    # values which can't be hashed are matched by reading the nodes
+    graph.add_node("d", {"k": [1]})
+    assert walk(graph, ["a", "b", "c", "d"]).has("k", [1]).active_nodes() == {"d"}
+    assert graph.find_nodes("k", [1]) == ["d"]
+    assert walk_where(graph, "k", [1]).active_nodes() == {"d"}
+
+
+def test_walk_where():
+    graph = build_graph()
+
+    assert sorted(walk_where(graph, "node_type", "Person").active_nodes()) == [
+        "Ceanne",
+        "Lainie",
+        "Sharlene",
+    ]
+
+    graph.index_attribute("node_type")
+    people = walk_where(graph, "node_type", "Person")
+    assert sorted(people.active_nodes()) == ["Ceanne", "Lainie", "Sharlene"]
+    assert people.follow("Lives In").active_nodes() == {"Bindoon", "Gingin", "Toodyay"}
+
+    assert walk_where(graph.compact(), "node_type", "Planet").active_nodes() == {"Saturn"}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_columnar_attributes()
+    test_columnar_attribute_types()
+    test_attribute_index()
+    test_attribute_index_has_matches_scan()
+    test_walk_where()
+
+    print("okay")
@@ -29,5 +29,99 @@ def test_dag_checks():
     assert et.get_exit_points() == []
 
 
+def test_topological_sort():
+    from travers.errors import CyclicGraphError
+
+    et = Graph()
+    et.add_node("a", None)
+    et.add_node("b", None)
+    et.add_node("c", None)
+    et.add_node("d", None)
+    et.add_node("e", None)
+    et.add_edge("a", "b", "forwards")
+    et.add_edge("a", "c", "forwards")
+    et.add_edge("b", "d", "forwards")
+    et.add_edge("c", "d", "forwards")
+    et.add_edge("a", "d", "forwards")
+    et.add_edge("a", "d", "backwards")
+
+    assert et.topological_generations() == [["a", "e"], ["b", "c"], ["d"]]
+    assert et.topological_sort() == ["a", "e", "b", "c", "d"]
+    assert et.is_acyclic()
+
+    et.add_edge("d", "a", "forwards")
+    assert not et.is_acyclic()
+    try:
+        et.topological_sort()
+    except CyclicGraphError:
+        pass
+    else:  # pragma: no cover
+        assert False, "cyclic graphs can't be sorted"
+
+
+def test_deep_dag_checks():
+    et = Graph()
+    for i in range(10000):
+        et.add_edge(i, i + 1, "forwards")
+
+    assert et.is_acyclic()
+    assert et.topological_sort() == list(range(10001))
+
+    et.add_edge(10000, 0, "forwards")
+    assert not et.is_acyclic()
+
+
+def test_degrees():
+    et = Graph()
+    for nid in "abcde":
+        et.add_node(nid, None)
+    et.add_edge("a", "b", "forwards")
+    et.add_edge("a", "c", "forwards")
+    et.add_edge("b", "c", "forwards")
+    et.add_edge("b", "c", "sideways")
+
+    assert et.out_degree("a") == 2
+    assert et.in_degree("a") == 0
+    assert et.in_degree("c") == 3
+    assert et.out_degree("z") == 0
+    assert et.degree_histogram() == {0: 3, 2: 2}
+    assert et.degree_histogram("in") == {0: 3, 1: 1, 3: 1}
+
+
+def test_entry_and_exit_points_after_mutation():
+    et = Graph()
+    for nid in "abcdef":
+        et.add_node(nid, None)
+
+    def check():
+        edges = list(et.edges())
+        sources = {s for s, _, _ in edges}
+        targets = {t for _, t, _ in edges}
+        assert et.get_entry_points() == sorted(sources - targets)
+        assert et.get_exit_points() == sorted(targets - sources)
+
+    et.add_edge("a", "b", "forwards")
+    et.add_edge("b", "c", "forwards")
+    et.add_edge("d", "c", "forwards")
+    check()
+    et.insert_node_before("x", None, "c")
+    check()
+    et.insert_node_after("y", None, "a")
+    check()
+    et.remove_edge("d", "x", "forwards")
+    check()
+    et.remove_node("x", heal=True)
+    check()
+    other = Graph()
+    other.add_edge("b", "e", "forwards")
+    other.add_edge("f", "a", "forwards")
+    et + other
+    check()
+
+
 if __name__ == "__main__":  # pragma: no cover
     test_dag_checks()
+    test_topological_sort()
+    test_deep_dag_checks()
+    test_degrees()
+    test_entry_and_exit_points_after_mutation()
@@ -0,0 +1,179 @@
+import os
+import sys
+import threading
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+import pytest
+from travers import Graph
+from travers.errors import ReadOnlyGraphError
+from travers.graphs import walk
+from data.graph_data import build_graph, graph_is_as_expected
+
+
+def graph_state(graph):
+    return (
+        sorted(graph.nodes(data=True), key=lambda n: n[0]),
+        sorted(graph.edges()),
+        sorted(e for n in graph.nodes() for e in graph.ingoing_edges(n)),
+        sorted(e for n in graph.nodes() for e in graph.outgoing_edges(n, "Lives In", "Mother")),
+        graph.get_entry_points(),
+        graph.get_exit_points(),
+        graph.find_nodes("node_type", "Person"),
+    )
+
+
+def test_snapshot_is_not_changed():
+    for columnar in (False, True):
+        graph = build_graph()
+        if columnar:
+            graph = Graph(columnar=True) + graph
+        graph.index_attribute("node_type")
+        before = graph_state(graph)
+
+        snapshot = graph.snapshot()
+        assert snapshot.is_snapshot and not graph.is_snapshot
+        graph_is_as_expected(snapshot)
+
+        graph.add_edge("Toodyay", "Gingin", "Near")
+        graph.remove_edge("Lainie", "Sharlene", "Mother")
+        graph.add_node("Ceanne", {"node_type": "Ghost"})
+        graph.remove_node("Kailis Bros", heal=True)
+        graph.insert_node_before("Bus", {"node_type": "Vehicle"}, "Bindoon")
+        graph.insert_node_after("Car", {"node_type": "Vehicle"}, "Lainie")
+        graph += build_graph()
+        graph.index_attribute("name")
+
+        assert graph_state(snapshot) == before
+        assert graph_state(graph) != before
+        graph_is_as_expected(snapshot)
+
+        # a second snapshot sees the changes, the first still doesn't
+        second = graph.snapshot()
+        graph.remove_edge("Toodyay", "Gingin", "Near")
+        assert ("Toodyay", "Gingin", "Near") in second.edges()
+        assert ("Toodyay", "Gingin", "Near") not in graph.edges()
+        assert graph_state(snapshot) == before
+
+
+def test_snapshot_changes_match_unshared_changes():
+    graph = build_graph()
+    unshared = build_graph()
+    edges = list(graph.edges())
+
+    for i, (source, target, relationship) in enumerate(edges * 2):
+        if i % 3 == 0:
+            graph.snapshot()
+        for g in (graph, unshared):
+            if i < len(edges):
+                g.remove_edge(source, target, relationship)
+                g.add_edge(target, source, relationship)
+            else:
+                g.add_edge(source, target, relationship)
+            g.add_node(f"{source}-{i}", {"index": i})
+        assert graph_state(graph) == graph_state(unshared)
+
+
+def test_snapshot_is_read_only():
+    snapshot = build_graph().snapshot()
+    assert snapshot.snapshot() is snapshot
+
+    with pytest.raises(ReadOnlyGraphError):
+        snapshot.add_edge("Lainie", "Gingin", "Visits")
+    with pytest.raises(ReadOnlyGraphError):
+        snapshot.add_node("Lainie", {})
+    with pytest.raises(ReadOnlyGraphError):
+        snapshot.remove_node("Lainie")
+    with pytest.raises(ReadOnlyGraphError):
+        snapshot["Lainie"] = {}
+
+    # but it can be traversed
+    assert walk(snapshot, "Lainie").follow("Mother").active_nodes() == {"Ceanne", "Sharlene"}
+
+
+def test_snapshot_threaded_reads():
+    graph = Graph()
+    for i in range(200):
+        graph.add_edge(i, i + 1, "Next")
+    snapshot = graph.snapshot()
+    expected = sorted(snapshot.edges())
+    errors = []
+
+    def read():
+        try:
+            for _ in range(20):
+                assert sorted(snapshot.edges()) == expected
+                assert len(snapshot.breadth_first_search(0, depth=500)) == 200
+        except Exception as err:  # pragma: no cover
+            errors.append(err)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        graph.remove_edge(i, i + 1, "Next")
+        graph.add_edge(i + 1, i, "Previous")
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert sorted(snapshot.edges()) == expected
+    assert len(list(graph.edges())) == 200
+
+
+def change(graph):
+    graph.add_edge("Toodyay", "Gingin", "Near")
+    graph.remove_edge("Lainie", "Sharlene", "Mother")
+    graph.add_node("Ceanne", {"node_type": "Ghost"})
+    graph.insert_node_after("Car", {"node_type": "Vehicle"}, "Lainie")
+
+
+def test_copy():
+    for columnar in (False, True):
+        graph = build_graph()
+        if columnar:
+            graph = Graph(columnar=True) + graph
+        graph.index_attribute("node_type")
+        before = graph_state(graph)
+
+        for options in ({}, {"deep": False}, {"lazy": True}, {"deep": False, "lazy": True}):
+            # changing the copy doesn't change the graph
+            copied = graph.copy(**options)
+            assert graph_state(copied) == before
+            change(copied)
+            assert graph_state(graph) == before
+            assert graph_state(copied) != before
+
+            # changing the graph doesn't change the copy
+            copied = graph.copy(**options)
+            change(graph)
+            assert graph_state(copied) == before
+            graph = copied
+
+        # copies of snapshots can be changed
+        copied = graph.snapshot().copy(lazy=True)
+        change(copied)
+        assert graph_state(graph) == before
+
+
+def test_copy_attributes():
+    graph = build_graph()
+
+    graph.copy()["Lainie"]["node_type"] = "Ghost"
+    assert graph["Lainie"]["node_type"] == "Person"
+    graph.copy(lazy=True)["Lainie"]["node_type"] = "Ghost"
+    assert graph["Lainie"]["node_type"] == "Person"
+
+    # shallow copies share the attributes
+    graph.copy(deep=False)["Lainie"]["node_type"] = "Ghost"
+    assert graph["Lainie"]["node_type"] == "Ghost"
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_snapshot_is_not_changed()
+    test_snapshot_changes_match_unshared_changes()
+    test_snapshot_is_read_only()
+    test_snapshot_threaded_reads()
+    test_copy()
+    test_copy_attributes()
+
+    print("okay")
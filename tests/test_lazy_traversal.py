@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from travers.graphs import walk
+from data.graph_data import build_graph
+
+
+def test_lazy_traversal():
+    graph = build_graph()
+
+    d_1 = walk(graph, "Lainie", lazy=True)
+    assert sorted(d_1.list_relationships()) == ["Likes", "Lives In", "Mother"]
+    assert d_1.active_nodes() == {"Lainie"}
+
+    d_2 = d_1.follow("Mother")
+    assert sorted(d_2.active_nodes()) == ["Ceanne", "Sharlene"]
+    assert d_2.values("node_type") == ["Person"]
+
+    d_3 = d_1.follow("Likes", "Lives In", "Mother")
+    assert sorted(d_3.has("node_type", "Person").active_nodes()) == [
+        "Ceanne",
+        "Sharlene",
+    ]
+    assert d_3.has("node_type", "Locality").active_nodes() == {"Toodyay"}
+    assert d_3.select(lambda r: r["node_type"] == "Restaurant").active_nodes() == {"Kailis Bros"}
+
+
+def test_lazy_traversal_plan():
+    graph = build_graph()
+
+    query = (
+        walk(graph, ["Lainie", "Hungry Jacks"], lazy=True)
+        .has("node_type", "Person")
+        .follow("Mother", "Daughter")
+        .has("node_type", "Person")
+        .select(lambda r: True)
+        .follow("Lives In")
+    )
+
+    # the filters are pushed into the stage of the follow before them
+    plan = query.plan()
+    assert [relationships for relationships, _ in plan] == [
+        None,
+        ("Mother", "Daughter"),
+        ("Lives In",),
+    ]
+    assert [len(filters) for _, filters in plan] == [1, 2, 0]
+
+    expected = (
+        walk(graph, ["Lainie", "Hungry Jacks"])
+        .has("node_type", "Person")
+        .follow("Mother", "Daughter")
+        .has("node_type", "Person")
+        .follow("Lives In")
+    )
+    assert query.active_nodes() == expected.active_nodes() == {"Bindoon", "Gingin"}
+    assert query.collect().follow("Located In").active_nodes() == set()
+
+
+def test_query_cache():
+    graph = build_graph()
+    cache = graph.enable_query_cache(maxsize=2)
+
+    def query():
+        return walk(graph, "Lainie", lazy=True).follow("Mother").has("node_type", "Person")
+
+    assert query().active_nodes() == {"Ceanne", "Sharlene"}
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert query().active_nodes() == {"Ceanne", "Sharlene"}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # changing the graph invalidates the cached results
+    version = graph.version
+    graph.add_edge("Lainie", "Lainie", "Mother")
+    assert graph.version > version
+    assert query().active_nodes() == {"Ceanne", "Lainie", "Sharlene"}
+    assert (cache.hits, cache.misses) == (1, 2)
+    graph.add_node("Lainie", {"node_type": "Locality"})
+    assert query().active_nodes() == {"Ceanne", "Sharlene"}
+    graph.remove_edge("Lainie", "Lainie", "Mother")
+    assert query().active_nodes() == {"Ceanne", "Sharlene"}
+    graph["Ceanne"] = {"node_type": "Ghost"}
+    assert query().active_nodes() == {"Sharlene"}
+    graph.remove_edge("Lainie", "Sharlene", "Mother")
+    assert query().active_nodes() == set()
+    version = graph.version
+    graph.remove_node("Hungry Jacks")
+    assert graph.version > version
+    assert query().active_nodes() == set()
+    assert cache.hits == 1
+
+    # adding an edge which is already in the graph isn't a change
+    version = graph.version
+    graph.add_edge("Lainie", "Ceanne", "Mother")
+    assert graph.version == version
+    assert query().active_nodes() == set()
+    assert cache.hits == 2
+
+    # the least recently used results are evicted
+    walk(graph, "Ceanne", lazy=True).follow("Lives In").active_nodes()
+    walk(graph, "Lainie", lazy=True).follow("Lives In").active_nodes()
+    assert len(cache) == 2
+    query().active_nodes()
+    assert len(cache) == 2
+    assert cache.hits == 2
+
+    assert graph.enable_query_cache(maxsize=0) is None
+    assert graph.query_cache is None
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_lazy_traversal()
+    test_lazy_traversal_plan()
+    test_query_cache()
+
+    print("okay")
@@ -6,7 +6,9 @@ sys.path.insert(1, os.path.join(sys.path[0], ".."))
 import shutil
 from pathlib import Path
 
+import pytest
 import travers
+from travers.graphs import walk
 
 from data.graph_data import build_graph, graph_is_as_expected
 
@@ -31,6 +33,288 @@ def test_save_graph():
         shutil.rmtree(TEST_FOLDER)
 
 
+def test_load_graph_in_chunks():
+    # test the streaming loader when records span chunks
+
+    from travers.graphs import internals
+
+    TEST_FOLDER = "TEST_CHUNKED_PERISTENCE"
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+    build_graph().save(TEST_FOLDER)
+
+    progress = []
+    chunk_size = internals.CHUNK_SIZE
+    internals.CHUNK_SIZE = 7
+    try:
+        g = travers.load(TEST_FOLDER, progress=lambda *args: progress.append(args))
+    finally:
+        internals.CHUNK_SIZE = chunk_size
+    graph_is_as_expected(g)
+    graph = build_graph()
+    assert g.ingoing_edges("Bindoon") == graph.ingoing_edges("Bindoon")
+    assert g.get_entry_points() == graph.get_entry_points()
+    assert g.get_exit_points() == graph.get_exit_points()
+    for nid in graph.nodes():
+        assert g.outgoing_relationships(nid) == graph.outgoing_relationships(nid)
+        assert sorted(g.ingoing_edges(nid)) == sorted(graph.ingoing_edges(nid))
+
+    assert len(progress) > 2
+    assert progress[-1][0] == "edges.jsonl"
+    assert progress[-1][1] == progress[-1][2]
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+
+def test_save_sharded_graph():
+    # test the save and parallel read of graphs saved as part files
+
+    TEST_FOLDER = "TEST_SHARDED_PERISTENCE"
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+    graph = build_graph()
+    graph.save(TEST_FOLDER, shards=3)
+
+    assert (Path(TEST_FOLDER) / "manifest.json").exists()
+    assert len(list(Path(TEST_FOLDER).glob("edges-*.jsonl"))) == 3
+
+    progress = []
+    g = travers.load(TEST_FOLDER, workers=2, progress=lambda *args: progress.append(args))
+    graph_is_as_expected(g)
+    assert sorted(g.edges()) == sorted(graph.edges())
+    assert sorted(g.ingoing_edges("Toodyay")) == sorted(graph.ingoing_edges("Toodyay"))
+    assert g["Lainie"] == {"node_type": "Person"}
+    assert len(progress) == 6
+
+    # the parts hold ranges of the nodes and sources, so the order is kept
+    assert list(g.nodes()) == list(graph.nodes())
+    assert list(g.edges()) == list(graph.edges())
+    assert g.get_entry_points() == graph.get_entry_points()
+    assert g.get_exit_points() == graph.get_exit_points()
+    for nid in graph.nodes():
+        assert g.outgoing_relationships(nid) == graph.outgoing_relationships(nid)
+        assert sorted(g.ingoing_edges(nid)) == sorted(graph.ingoing_edges(nid))
+
+    # edges with an undefined node are skipped, as they are in a single file
+    with open(Path(TEST_FOLDER) / "edges-00000.jsonl", "ab") as edge_file:
+        edge_file.write(b'{"source": null, "target": "Lainie", "relationship": "Mother"}\n')
+    assert list(travers.load(TEST_FOLDER, workers=2).edges()) == list(graph.edges())
+
+    # saving with fewer shards removes the parts it doesn't replace
+    graph.save(TEST_FOLDER, shards=2)
+    assert sorted(p.name for p in Path(TEST_FOLDER).iterdir()) == [
+        "edges-00000.jsonl",
+        "edges-00001.jsonl",
+        "manifest.json",
+        "nodes-00000.jsonl",
+        "nodes-00001.jsonl",
+    ]
+
+    # saving again without shards replaces the manifest and the parts
+    graph.save(TEST_FOLDER)
+    assert not (Path(TEST_FOLDER) / "manifest.json").exists()
+    assert sorted(p.name for p in Path(TEST_FOLDER).iterdir()) == ["edges.jsonl", "nodes.jsonl"]
+    graph_is_as_expected(travers.load(TEST_FOLDER))
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+
+def test_save_binary_graph():
+    # test the save and memory-mapped read of the binary format
+
+    TEST_FOLDER = "TEST_BINARY_PERISTENCE"
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+    graph = build_graph()
+    graph.compact().save(TEST_FOLDER)
+
+    g = travers.load(TEST_FOLDER)
+    assert isinstance(g, travers.CompactGraph)
+    graph_is_as_expected(g)
+    assert sorted(g.edges()) == sorted(graph.edges())
+    assert g["Lainie"] == {"node_type": "Person"}
+    assert sorted(g.ingoing_edges("Toodyay")) == sorted(graph.ingoing_edges("Toodyay"))
+    assert g.outgoing_edges("Lainie", "Mother") == graph.outgoing_edges("Lainie", "Mother")
+    assert g.shortest_path("Lainie", "Bindoon") == ["Lainie", "Sharlene", "Bindoon"]
+
+    # node IDs are found in the file, not in a dictionary built when it is opened
+    assert not isinstance(g._nid_index, dict)
+    for nid in graph.nodes():
+        assert g[nid] == graph[nid]
+    assert g["Nobody"] is None and g[1] is None and g[["Lainie"]] is None
+    assert walk(g, ["Lainie", "Nobody"], vectorised=True).active_nodes() == {"Lainie"}
+
+    del g
+
+    # node IDs of other types are found too
+    numbered = travers.Graph()
+    for i in range(100):
+        numbered.add_node(i, {"i": i})
+        numbered.add_node(str(i), {"s": i})
+        numbered.add_edge(i, str(i), "Named")
+    numbered.compact().save(TEST_FOLDER)
+    g = travers.load(TEST_FOLDER)
+    assert all(g[i] == {"i": i} and g[str(i)] == {"s": i} for i in range(100))
+    assert g.outgoing_edges(42) == [(42, "42", "Named")]
+    assert list(g.nodes()) == list(numbered.nodes())
+    del g
+
+    # saving in the other format replaces the saved graph
+    other = travers.Graph()
+    other.add_node("other", {})
+    other.save(TEST_FOLDER, shards=2)
+    assert not (Path(TEST_FOLDER) / "graph.bin").exists()
+    assert travers.load(TEST_FOLDER).nodes() == ["other"]
+
+    graph.compact().save(TEST_FOLDER)
+    assert sorted(Path(TEST_FOLDER).iterdir()) == [Path(TEST_FOLDER) / "graph.bin"]
+    graph_is_as_expected(travers.load(TEST_FOLDER))
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+
+def test_mutation_log():
+    # test changes appended to a log are replayed when the graph is loaded
+
+    TEST_FOLDER = "TEST_LOGGED_PERISTENCE"
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+    graph = build_graph()
+    graph.save(TEST_FOLDER, shards=2)
+    graph.attach_log(TEST_FOLDER)
+
+    graph.add_edge("Toodyay", "Gingin", "Near")
+    graph.add_edge("Toodyay", "Gingin", "Near")
+    graph.remove_edge("Lainie", "Sharlene", "Mother")
+    graph.add_node("Ceanne", {"node_type": "Ghost"})
+    graph.remove_node("Kailis Bros", heal=True)
+    graph.insert_node_before("Bus", {"node_type": "Vehicle"}, "Bindoon")
+    graph.insert_node_after("Car", {"node_type": "Vehicle"}, "Lainie")
+    graph["Lainie"] = {"node_type": "Person", "age": 40}
+    graph += travers.Graph() + build_graph()
+
+    log = Path(TEST_FOLDER) / "mutations.jsonl"
+    assert log.read_bytes().splitlines()[:2] == [
+        b'["add_edge","Toodyay","Gingin","Near"]',
+        b'["remove_edge","Lainie","Sharlene","Mother"]',
+    ]
+
+    def same_graph(g):
+        assert sorted(g.nodes(data=True)) == sorted(graph.nodes(data=True))
+        for nid in g.nodes():
+            assert g.outgoing_edges(nid) == graph.outgoing_edges(nid)
+            assert sorted(g.ingoing_edges(nid)) == sorted(graph.ingoing_edges(nid))
+
+    same_graph(travers.load(TEST_FOLDER))
+
+    # a change which was only partly written is ignored
+    with open(log, "ab") as log_file:
+        log_file.write(b'["add_edge", "Lainie", "Gin')
+    same_graph(travers.load(TEST_FOLDER))
+
+    # compacting saves the changes and empties the log
+    graph.detach_log()
+    travers.graphs.compact_log(TEST_FOLDER)
+    assert not log.exists()
+    assert (Path(TEST_FOLDER) / "manifest.json").exists()
+    same_graph(travers.load(TEST_FOLDER))
+
+    # saving the graph empties the log it is attached to
+    graph.attach_log(TEST_FOLDER)
+    graph.remove_edge("Toodyay", "Gingin", "Near")
+    assert log.stat().st_size > 0
+    same_graph(travers.load(TEST_FOLDER))
+    graph.save(TEST_FOLDER)
+    assert log.stat().st_size == 0
+    graph.add_edge("Toodyay", "Gingin", "Near")
+    same_graph(travers.load(TEST_FOLDER))
+    graph.detach_log()
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+
+def test_mutation_log_partial_record():
+    # test a partly written change is removed before more changes are logged
+
+    TEST_FOLDER = "TEST_PARTIAL_LOG_PERISTENCE"
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+    graph = build_graph()
+    graph.save(TEST_FOLDER)
+    graph.attach_log(TEST_FOLDER)
+    graph.add_edge("Toodyay", "Gingin", "Near")
+    graph.detach_log()
+
+    log = Path(TEST_FOLDER) / "mutations.jsonl"
+    with open(log, "ab") as log_file:
+        log_file.write(b'["add_edge", "Lainie", "Gin')
+
+    graph.attach_log(TEST_FOLDER)
+    graph.add_edge("Gingin", "Toodyay", "Near")
+
+    # the graph can't be compacted while it is writing to the log
+    with pytest.raises(ValueError):
+        travers.graphs.compact_log(TEST_FOLDER)
+    graph.detach_log()
+
+    g = travers.load(TEST_FOLDER)
+    assert sorted(g.edges()) == sorted(graph.edges())
+    assert ("Gingin", "Toodyay", "Near") in g.edges()
+    assert len(log.read_bytes().splitlines()) == 2
+
+    travers.graphs.compact_log(TEST_FOLDER)
+    assert sorted(travers.load(TEST_FOLDER).edges()) == sorted(graph.edges())
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+
+def test_mutation_log_folder_spelling():
+    # test the log is recognised when its folder is named differently
+
+    TEST_FOLDER = "TEST_SPELLED_LOG_PERISTENCE"
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+    graph = build_graph()
+    graph.save(TEST_FOLDER)
+    graph.attach_log(Path(TEST_FOLDER).absolute())
+
+    # saving to the same folder empties the log rather than removing it
+    graph.save(Path(TEST_FOLDER) / ".." / TEST_FOLDER)
+    graph.add_edge("Toodyay", "Gingin", "Near")
+    assert ("Toodyay", "Gingin", "Near") in travers.load(TEST_FOLDER).edges()
+
+    # other graphs can't remove the log while it is attached
+    with pytest.raises(ValueError):
+        build_graph().save(TEST_FOLDER)
+    with pytest.raises(ValueError):
+        build_graph().compact().save(TEST_FOLDER)
+    assert ("Toodyay", "Gingin", "Near") in travers.load(TEST_FOLDER).edges()
+
+    graph.detach_log()
+    build_graph().compact().save(TEST_FOLDER)
+    assert ("Toodyay", "Gingin", "Near") not in travers.load(TEST_FOLDER).edges()
+
+    if Path(TEST_FOLDER).exists():
+        shutil.rmtree(TEST_FOLDER)
+
+
 def test_networkx():
     graph = build_graph()
 
@@ -43,9 +327,32 @@ def test_read_graphml():
     graph_is_as_expected(graph)
 
 
+def test_write_graphml():
+    TEST_FILE = "TEST_GRAPHML.graphml"
+
+    graph = build_graph()
+    graph.add_node("<Escaped & 'Quoted'>", {"node_type": "Planet", "moons": 0})
+    graph.add_edge("Saturn", "<Escaped & 'Quoted'>", None)
+    graph.to_graphml(TEST_FILE)
+
+    g = travers.read_graphml(TEST_FILE)
+    assert sorted(g.edges(), key=str) == sorted(graph.edges(), key=str)
+    assert g["Lainie"] == {"node_type": "Person"}
+    assert g["<Escaped & 'Quoted'>"] == {"node_type": "Planet", "moons": "0"}
+
+    os.remove(TEST_FILE)
+
+
 if __name__ == "__main__":
     test_save_graph()
+    test_load_graph_in_chunks()
+    test_save_sharded_graph()
+    test_save_binary_graph()
+    test_mutation_log()
+    test_mutation_log_partial_record()
+    test_mutation_log_folder_spelling()
     test_networkx()
     test_read_graphml()
+    test_write_graphml()
 
     print("okay")
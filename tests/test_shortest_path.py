@@ -55,9 +55,44 @@ def test_shortest_path_missing_node():
     assert graph.shortest_path("A", "B") == []
 
 
+def test_shortest_path_bidirectional():
+    graph = Graph()
+
+    graph.add_edge("A", "B")
+    graph.add_edge("A", "C")
+    graph.add_edge("B", "D")
+    graph.add_edge("C", "D")
+    graph.add_edge("D", "E")
+    graph.add_node("F", "F")
+
+    assert graph.shortest_path("A", "B", bidirectional=True) == ["A", "B"]
+    assert graph.shortest_path("A", "D", bidirectional=True) in (["A", "B", "D"], ["A", "C", "D"])
+    assert graph.shortest_path("A", "E", True) in (["A", "B", "D", "E"], ["A", "C", "D", "E"])
+    assert graph.shortest_path("A", "A", bidirectional=True) == ["A"]
+    assert graph.shortest_path("A", "F", bidirectional=True) == []
+    assert graph.shortest_path("E", "A", bidirectional=True) == []
+    assert graph.shortest_path("A", "Z", bidirectional=True) == []
+
+
+def test_shortest_path_long_chain():
+    graph = Graph()
+
+    # a long chain with a shortcut half way along
+    for i in range(5000):
+        graph.add_edge(i, i + 1)
+    graph.add_edge(1000, 4000)
+
+    expected = list(range(1001)) + list(range(4000, 5001))
+    assert graph.shortest_path(0, 5000) == expected
+    assert graph.shortest_path(0, 5000, bidirectional=True) == expected
+    assert graph.compact().shortest_path(0, 5000, bidirectional=True) == expected
+
+
 if __name__ == "__main__":  # pragma: no cover
     test_shortest_path()
     test_shortest_path_empty_graph()
     test_shortest_path_missing_node()
+    test_shortest_path_bidirectional()
+    test_shortest_path_long_chain()
 
     print("okay")
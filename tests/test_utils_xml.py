@@ -29,5 +29,28 @@ def test_simple_xml_parse():
     assert doc["mydocument"]["plus"]["#text"] == "element as well"
 
 
+def test_streaming_xml_parse():
+    import io
+
+    STREAMED_XML = """
+    <document xmlns="http://example.com/ns">
+      <item id="1"><value>one</value></item>
+      <item id="2"><value>two</value></item>
+      <other />
+    </document>
+    """
+
+    seen = []
+    for tag, element in xmler.iterparse(io.StringIO(STREAMED_XML), {"item", "other"}):
+        seen.append((tag, element.get("id"), [child.text for child in element]))
+
+    assert seen == [
+        ("item", "1", ["one"]),
+        ("item", "2", ["two"]),
+        ("other", None, []),
+    ]
+
+
 if __name__ == "__main__":
     test_simple_xml_parse()
+    test_streaming_xml_parse()
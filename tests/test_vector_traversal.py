@@ -0,0 +1,99 @@
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+from travers import Graph
+from travers.graphs import walk
+from data.graph_data import build_graph
+
+
+def test_vectorised_traversal():
+    graph = build_graph()
+
+    d_1 = walk(graph, "Lainie", vectorised=True)
+
+    # test the start is from the right point
+    assert sorted(d_1.list_relationships()) == ["Likes", "Lives In", "Mother"]
+    assert d_1.active_nodes() == {"Lainie"}
+
+    # test follow
+    d_2 = d_1.follow("Mother")
+    assert sorted(d_2.list_relationships()) == [
+        "Daughter",
+        "Likes",
+        "Lives In",
+        "Sister",
+    ]
+    assert sorted(d_2.active_nodes()) == ["Ceanne", "Sharlene"]
+    assert d_2.values("node_type") == ["Person"]
+
+    # test filtering
+    d_3 = d_1.follow("Likes", "Lives In", "Mother")
+    assert sorted(d_3.has("node_type", "Person").active_nodes()) == [
+        "Ceanne",
+        "Sharlene",
+    ]
+    assert d_3.has("node_type", "Locality").active_nodes() == {"Toodyay"}
+    assert d_3.has("node_type", "Moon").active_nodes() == set()
+    assert d_3.select(lambda r: r["node_type"] == "Restaurant").active_nodes() == {"Kailis Bros"}
+
+
+def test_vectorised_traversal_matches():
+    graph = build_graph()
+    compact = graph.compact()
+
+    for nid in graph.nodes():
+        expected = walk(graph, nid)
+        actual = walk(compact, nid, vectorised=True)
+        for _ in range(3):
+            expected = expected.follow("Likes", "Lives In", "Mother", "Sister", "Daughter")
+            actual = actual.follow("Likes", "Lives In", "Mother", "Sister", "Daughter")
+            assert actual.active_nodes() == expected.active_nodes()
+            assert sorted(actual.values("node_type")) == sorted(expected.values("node_type"))
+
+    assert len(walk(compact, ["Lainie", "Perth"], vectorised=True)) == 1
+    assert len(walk(compact, "Lainie", vectorised=True).follow("Unknown")) == 0
+
+
+def test_vectorised_traversal_reuses_compacted_graph():
+    graph = build_graph()
+
+    first = walk(graph, "Lainie", vectorised=True)
+    assert walk(graph, "Ceanne", vectorised=True).graph is first.graph
+    assert first.follow("Mother").active_nodes() == {"Ceanne", "Sharlene"}
+
+    # changing the graph builds a new compacted graph
+    graph.add_edge("Lainie", "Saturn", "Mother")
+    changed = walk(graph, "Lainie", vectorised=True)
+    assert changed.graph is not first.graph
+    assert changed.follow("Mother").active_nodes() == {"Ceanne", "Sharlene", "Saturn"}
+    assert first.follow("Mother").active_nodes() == {"Ceanne", "Sharlene"}
+
+
+def test_vectorised_attribute_types():
+    graph = Graph()
+    values = {"a": 1, "b": True, "c": 1.0, "d": 0.0, "e": False, "f": 0}
+    for nid, value in values.items():
+        graph.add_node(nid, {"x": value})
+
+    nodes = walk(graph, list(values), vectorised=True)
+    # equal values are one value, as they are for the other traversals
+    for options in ({}, {"vectorised": True}, {"lazy": True}):
+        assert sorted(walk(graph, list(values), **options).values("x")) == [0, 1]
+    assert nodes.has("x", 1).active_nodes() == {"a", "b", "c"}
+    assert nodes.has("x", False).active_nodes() == {"d", "e", "f"}
+
+    # values which can't be hashed are compared node by node
+    graph.add_node("g", {"x": ["y"]})
+    nodes = walk(graph, [*values, "g"], vectorised=True)
+    assert nodes.has("x", ["y"]).active_nodes() == {"g"}
+    assert nodes.has("x", 1).active_nodes() == {"a", "b", "c"}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_vectorised_traversal()
+    test_vectorised_traversal_matches()
+    test_vectorised_traversal_reuses_compacted_graph()
+    test_vectorised_attribute_types()
+
+    print("okay")
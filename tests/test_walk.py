@@ -4,6 +4,7 @@ import sys
 sys.path.insert(1, os.path.join(sys.path[0], ".."))
 from travers import Graph
 from travers.graphs import walk
+from travers.graphs import walk_many
 from data.graph_data import build_graph, graph_is_as_expected
 
 
@@ -38,7 +39,103 @@ def test_traversal():
     assert d_3.select(lambda r: r["node_type"] == "Restaurant").active_nodes() == {"Kailis Bros"}
 
 
+def test_repeat():
+    graph = Graph()
+    for source, target in [("a", "b"), ("b", "c"), ("c", "d"), ("d", "b"), ("c", "e")]:
+        graph.add_edge(source, target, "Depends On")
+    graph.add_edge("a", "x", "Owned By")
+    for nid in "abcdex":
+        graph.add_node(nid, {"name": nid, "leaf": nid in "ex"})
+
+    start = walk(graph, "a")
+    assert start.repeat("Depends On").active_nodes() == {"b", "c", "d", "e"}
+    assert start.repeat(["Depends On", "Owned By"]).active_nodes() == {"b", "c", "d", "e", "x"}
+    assert start.repeat("Depends On", times=2).active_nodes() == {"b", "c"}
+    assert start.repeat("Depends On", times=2, emit=False).active_nodes() == {"c"}
+    assert start.repeat("Depends On", times=10, emit=False).active_nodes() == set()
+
+    # nodes matching until are not expanded
+    assert start.repeat("Depends On", until=lambda n: n["name"] == "c").active_nodes() == {"b", "c"}
+    leaves = start.repeat("Depends On", until=lambda n: n["leaf"], emit=False)
+    assert leaves.active_nodes() == {"e"}
+
+    # the starting nodes are only active if they are reached again
+    assert walk(graph, "b").repeat("Depends On").active_nodes() == {"b", "c", "d", "e"}
+    assert start.repeat("Unknown").active_nodes() == set()
+
+
+def test_reverse_traversal():
+    graph = build_graph()
+
+    restaurants = walk(graph, "Gingin").follow_in("Located In")
+    assert restaurants.active_nodes() == {"Chicken Treat", "Hungry Jacks"}
+    assert walk(graph, "Gingin").follow_in("Lives In").active_nodes() == {"Ceanne"}
+    assert walk(graph, "Gingin").follow_in().active_nodes() == set()
+    assert walk(graph, "Lainie").follow_in("Mother").active_nodes() == set()
+    assert walk(graph, "Lainie").follow_in("Daughter", "Likes").active_nodes() == {
+        "Ceanne",
+        "Sharlene",
+    }
+
+    # following in and out
+    assert walk(graph, "Kailis Bros").both("Likes", "Located In").active_nodes() == {
+        "Ceanne",
+        "Lainie",
+        "Toodyay",
+    }
+    assert walk(graph, "Lainie").both("Mother").active_nodes() == {"Ceanne", "Sharlene"}
+
+    # the same steps over a CompactGraph
+    compact = graph.compact()
+    assert walk(compact, "Gingin").follow_in("Located In").active_nodes() == {
+        "Chicken Treat",
+        "Hungry Jacks",
+    }
+    assert walk(compact, "Kailis Bros").both("Likes", "Located In").active_nodes() == {
+        "Ceanne",
+        "Lainie",
+        "Toodyay",
+    }
+
+
+def test_walk_many():
+    graph = build_graph()
+    queries = [["Lainie"], "Ceanne", {"Sharlene", "Lainie"}, [], "Unknown"]
+
+    batch = walk_many(graph, queries)
+    assert batch.active_nodes() == [
+        {"Lainie"},
+        {"Ceanne"},
+        {"Sharlene", "Lainie"},
+        set(),
+        {"Unknown"},
+    ]
+
+    batch = batch.follow("Mother", "Daughter", "Likes")
+    assert [sorted(values) for values in batch.values("node_type")] == [
+        ["Person", "Restaurant"],
+        ["Person", "Restaurant"],
+        ["Person", "Restaurant"],
+        [],
+        [],
+    ]
+    people = batch.has("node_type", "Person")
+    for nids, active_nodes in zip(queries, people.active_nodes()):
+        expected = walk(graph, nids).follow("Mother", "Daughter", "Likes")
+        assert active_nodes == expected.has("node_type", "Person").active_nodes()
+    assert people.active_nodes()[1] == {"Lainie"}
+
+    assert batch.list_relationships()[1] == {"Likes", "Lives In", "Mother", "Located In"}
+    assert walk_many(graph, queries).follow().active_nodes() == [set()] * 5
+
+    traversals = people.traversals()
+    assert traversals[2].follow("Lives In").active_nodes() == {"Bindoon", "Gingin", "Toodyay"}
+
+
 if __name__ == "__main__":
     test_traversal()
+    test_repeat()
+    test_reverse_traversal()
+    test_walk_many()
 
     print("okay")
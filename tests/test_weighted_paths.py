@@ -0,0 +1,105 @@
+# isort: skip_file
+"""
+Test the weighted path searches
+"""
+import os
+import sys
+
+sys.path.insert(1, os.path.join(sys.path[0], ".."))
+
+from travers import Graph
+
+
+def build_road_graph():
+    """
+    Create a graph of roads, the relationship is the type of road
+    """
+    graph = Graph()
+
+    graph.add_edge("A", "B", "highway")
+    graph.add_edge("B", "D", "highway")
+    graph.add_edge("A", "C", "street")
+    graph.add_edge("C", "D", "street")
+    graph.add_edge("A", "D", "track")
+    graph.add_edge("D", "E", "street")
+
+    return graph
+
+
+def test_cheapest_path():
+    graph = build_road_graph()
+
+    # unweighted, the track is the fewest hops
+    assert graph.cheapest_path("A", "E") == (2, ["A", "D", "E"])
+
+    # weighted by relationship
+    weights = {"highway": 1, "street": 3, "track": 10}
+    assert graph.cheapest_path("A", "E", weights) == (5, ["A", "B", "D", "E"])
+
+    # relationships without a weight aren't followed
+    assert graph.cheapest_path("A", "D", {"street": 1}) == (2, ["A", "C", "D"])
+    assert graph.cheapest_path("A", "E", {"highway": 1}) == (float("inf"), [])
+
+    # weighted by a function
+    def avoid_b(source, target, relationship):
+        return None if target == "B" else 1
+
+    assert graph.cheapest_path("A", "E", avoid_b) == (2, ["A", "D", "E"])
+
+    assert graph.cheapest_path("A", "A") == (0, ["A"])
+    assert graph.cheapest_path("E", "A") == (float("inf"), [])
+
+
+def test_cheapest_path_a_star():
+    graph = Graph()
+    for x in range(10):
+        for y in range(10):
+            if x < 9:
+                graph.add_edge((x, y), (x + 1, y), "east")
+            if y < 9:
+                graph.add_edge((x, y), (x, y + 1), "north")
+
+    def manhattan(node):
+        return (9 - node[0]) + (9 - node[1])
+
+    cost, path = graph.cheapest_path((0, 0), (9, 9), heuristic=manhattan)
+    assert cost == 18
+    assert len(path) == 19
+    assert path[0] == (0, 0) and path[-1] == (9, 9)
+
+
+def test_cheapest_path_negative_weight():
+    graph = build_road_graph()
+
+    try:
+        graph.cheapest_path("A", "E", {"highway": -1, "street": 1})
+    except ValueError:
+        pass
+    else:  # pragma: no cover
+        assert False, "negative weights should be rejected"
+
+
+def test_k_shortest_paths():
+    graph = build_road_graph()
+    weights = {"highway": 1, "street": 3, "track": 10}
+
+    paths = graph.k_shortest_paths("A", "E", 3, weights)
+    assert paths == [
+        (5, ["A", "B", "D", "E"]),
+        (9, ["A", "C", "D", "E"]),
+        (13, ["A", "D", "E"]),
+    ]
+
+    assert graph.k_shortest_paths("A", "E", 10, weights) == paths
+    assert graph.k_shortest_paths("A", "E", 1, weights) == paths[:1]
+    assert graph.k_shortest_paths("E", "A", 3, weights) == []
+    assert graph.k_shortest_paths("A", "E", 0, weights) == []
+
+
+if __name__ == "__main__":  # pragma: no cover
+    test_cheapest_path()
+    test_cheapest_path_a_star()
+    test_cheapest_path_negative_weight()
+    test_k_shortest_paths()
+
+    print("okay")
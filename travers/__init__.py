@@ -18,6 +18,7 @@ limitations under the License.
 
 from travers.__version__ import __author__
 from travers.__version__ import __version__
+from travers.graphs.compact_graph import CompactGraph
 from travers.graphs.graph import Graph
 from travers.graphs.internals import load
 from travers.graphs.internals import read_graphml
@@ -26,3 +26,11 @@ class MissingDependencyError(Exception):
 
 class NodeNotFoundError(Exception):
     pass
+
+
+class CyclicGraphError(Exception):
+    pass
+
+
+class ReadOnlyGraphError(Exception):
+    pass
@@ -1,4 +1,8 @@
+from .compact_graph import CompactGraph
 from .graph import Graph
+from .internals import compact_log
 from .internals import load
 from .internals import read_graphml
 from .internals import walk
+from .internals import walk_many
+from .internals import walk_where
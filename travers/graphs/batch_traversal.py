@@ -0,0 +1,136 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from typing import Callable
+from typing import List
+
+from travers.graphs.graph_traversal import GraphTraversal
+
+
+class BatchTraversal:
+    """
+    Graph Traversal of many queries at once.
+
+    Each query has its own set of active nodes, each step is run once for
+    every node active in any of the queries and the results shared between
+    the queries; so nodes active in many queries have their edges followed,
+    and their attributes filtered, once rather than once for each query.
+    """
+
+    __slots__ = ("graph", "_queries")
+
+    def __init__(self, graph, queries: List[set]):
+        """
+        Batch Graph Traversal
+
+        Parameters:
+            graph: Graph
+            queries: list of sets
+                The active nodes of each query
+        """
+        self.graph = graph
+        self._queries = queries
+
+    def _distinct_nodes(self) -> set:
+        """internal helper method, the nodes active in any of the queries"""
+        return set().union(*self._queries)
+
+    def follow(self, *relationships):
+        """
+        Traverses a graph by following edges from the active nodes with
+        a relationship on the list of relationships.
+
+        Parameters:
+            relationsips: strings
+                traverses node following edges with the stated relationship
+
+        Returns:
+            BatchTraversal
+        """
+        if not relationships:
+            return BatchTraversal(self.graph, [set() for _ in self._queries])
+
+        targets = {
+            node: [t for _, t, _ in self.graph.outgoing_edges(node, *relationships)]
+            for node in self._distinct_nodes()
+        }
+        queries = []
+        for active_nodes in self._queries:
+            reached: set = set()
+            for node in active_nodes:
+                reached.update(targets[node])
+            queries.append(reached)
+        return BatchTraversal(self.graph, queries)
+
+    def select(self, filter: Callable):
+        """
+        Filters the active nodes by a function.
+
+        Parameters:
+            filter: Callable
+                node attribute name to filter on
+
+        Returns:
+            BatchTraversal
+        """
+        graph = self.graph
+        matches = {nid for nid in self._distinct_nodes() if filter(graph[nid])}
+        return BatchTraversal(graph, [active_nodes & matches for active_nodes in self._queries])
+
+    def has(self, key, value):
+        """
+        Filters the active nodes by a key/value match
+        """
+        return self.select(lambda attrib: attrib.get(key) == value)
+
+    def values(self, key) -> List[list]:
+        graph = self.graph
+        values = {}
+        for nid in self._distinct_nodes():
+            attrib = graph[nid]
+            if key in attrib:
+                values[nid] = attrib[key]
+        return [
+            list({values[nid] for nid in active_nodes if nid in values})
+            for active_nodes in self._queries
+        ]
+
+    def active_nodes(self) -> List[set]:
+        return self._queries
+
+    def list_relationships(self) -> List[set]:
+        graph = self.graph
+        relationships = {nid: graph.outgoing_relationships(nid) for nid in self._distinct_nodes()}
+        results = []
+        for active_nodes in self._queries:
+            found: set = set()
+            for nid in active_nodes:
+                found.update(relationships[nid])
+            results.append(found)
+        return results
+
+    def traversals(self) -> List[GraphTraversal]:
+        """
+        Continue each query as a separate traversal.
+        """
+        return [GraphTraversal(graph=self.graph, active_nodes=nids) for nids in self._queries]
+
+    def __repr__(self):  # pragma: no-cover
+        return f"BatchTraversal - {len(self._queries)} queries"
+
+    def __len__(self):  # pragma: no-cover
+        return len(self._queries)
@@ -0,0 +1,264 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Binary persistence for CompactGraphs.
+
+The file is laid out as a fixed header, a table of sections and then the
+sections themselves, each section starts on an 8 byte boundary:
+
+    header:     magic, node total, node count, label count, edge count,
+                node typecode, label typecode
+    sections:   (offset, length) for each of the sections below
+    nids:       offsets into, and a blob of, JSON encoded node IDs, followed
+                by the interned node IDs ordered by their encoding
+    labels:     JSON list of the interned relationships
+    CSR arrays: outgoing offsets, targets and relationships followed by
+                incoming offsets, sources and relationships
+    attributes: offsets into, and a blob of, JSON encoded node attributes
+
+Files are opened with `mmap`, the CSR arrays are read directly from the
+mapped file and node IDs and attributes are only decoded when they are
+accessed; node IDs are found with a binary search of their encodings
+rather than a dictionary of every node. So opening a graph is fast and
+the pages are shared by every process which opens the same file.
+"""
+
+import mmap
+import struct
+from array import array
+from pathlib import Path
+
+import orjson
+
+BINARY_FILE = "graph.bin"
+MAGIC = b"TRAVERS\x02"
+
+_HEADER = struct.Struct("<8sqqqqcc6x")
+_SECTION = struct.Struct("<qq")
+_SECTIONS = (
+    "nid_offsets",
+    "nids",
+    "nid_order",
+    "labels",
+    "out_offsets",
+    "out_targets",
+    "out_relationships",
+    "in_offsets",
+    "in_sources",
+    "in_relationships",
+    "attribute_offsets",
+    "attributes",
+)
+
+
+class _AttributeTable:
+    """
+    Sequence of node attributes, decoded from the mapped file on access.
+    """
+
+    __slots__ = ("_offsets", "_blob")
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return orjson.loads(self._blob[self._offsets[index] : self._offsets[index + 1]])
+
+
+class _NodeTable(_AttributeTable):
+    """
+    Sequence of node IDs, decoded from the mapped file on access, which finds
+    the interned ID of a node ID by a binary search of the encoded node IDs.
+    """
+
+    __slots__ = ("_order",)
+
+    def __init__(self, offsets, blob, order):
+        super().__init__(offsets, blob)
+        self._order = order
+
+    def _encoded(self, index) -> bytes:
+        """internal helper method, the encoding of an interned node ID"""
+        return bytes(self._blob[self._offsets[index] : self._offsets[index + 1]])
+
+    def get(self, nid, default=None):
+        """
+        The interned ID of a node ID, or the default if it isn't in the graph.
+        """
+        try:
+            encoded = orjson.dumps(nid)
+        except TypeError:
+            return default
+        order = self._order
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._encoded(order[middle]) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and self._encoded(order[low]) == encoded:
+            return order[low]
+        return default
+
+
+def _typecode_of(buffer) -> str:
+    """internal helper method, the typecode of an array or memoryview"""
+    if isinstance(buffer, array):
+        return buffer.typecode
+    return buffer.format
+
+
+def write_binary(compact, graph_path):
+    """
+    Persist a CompactGraph to storage in the binary format.
+
+    Parameters:
+        compact: CompactGraph
+            The graph to save
+        graph_path: string
+            The folder to save the graph file to
+    """
+    from travers.graphs.graph import MANIFEST_FILE
+    from travers.graphs.mutation_log import LOG_FILE
+    from travers.graphs.mutation_log import is_open
+
+    path = Path(graph_path)
+    if is_open(path / LOG_FILE):
+        raise ValueError(
+            f"the mutation log in '{graph_path}' is attached to a Graph, detach it first"
+        )
+    path.mkdir(exist_ok=True)
+
+    # remove any Graph saved to the folder, so it can't be mistaken for this one
+    for name in ("nodes.jsonl", "edges.jsonl", MANIFEST_FILE, LOG_FILE):
+        (path / name).unlink(missing_ok=True)
+    for part in [*path.glob("nodes-*.jsonl"), *path.glob("edges-*.jsonl")]:
+        part.unlink()
+
+    nid_offsets = array("q", [0])
+    nid_blob = bytearray()
+    encoded_nids = []
+    for index in range(len(compact._nids)):
+        encoded_nids.append(orjson.dumps(compact._nids[index]))
+        nid_blob += encoded_nids[-1]
+        nid_offsets.append(len(nid_blob))
+    nid_order = array(
+        _typecode_of(compact._out_targets),
+        sorted(range(len(encoded_nids)), key=encoded_nids.__getitem__),
+    )
+
+    attribute_offsets = array("q", [0])
+    attribute_blob = bytearray()
+    for attributes in compact._attributes[: len(compact._nids)]:
+        attribute_blob += orjson.dumps(attributes)
+        attribute_offsets.append(len(attribute_blob))
+
+    sections = [
+        nid_offsets.tobytes(),
+        bytes(nid_blob),
+        nid_order.tobytes(),
+        orjson.dumps(compact._labels),
+        compact._out_offsets.tobytes(),
+        compact._out_targets.tobytes(),
+        compact._out_relationships.tobytes(),
+        compact._in_offsets.tobytes(),
+        compact._in_sources.tobytes(),
+        compact._in_relationships.tobytes(),
+        attribute_offsets.tobytes(),
+        bytes(attribute_blob),
+    ]
+
+    header = _HEADER.pack(
+        MAGIC,
+        len(compact._nids),
+        compact._node_count,
+        len(compact._labels),
+        len(compact._out_targets),
+        _typecode_of(compact._out_targets).encode(),
+        _typecode_of(compact._out_relationships).encode(),
+    )
+
+    position = _HEADER.size + _SECTION.size * len(_SECTIONS)
+    table = []
+    for section in sections:
+        position += -position % 8
+        table.append((position, len(section)))
+        position += len(section)
+
+    with open(path / BINARY_FILE, "wb") as graph_file:
+        graph_file.write(header)
+        for offset, length in table:
+            graph_file.write(_SECTION.pack(offset, length))
+        for (offset, _), section in zip(table, sections):
+            graph_file.write(b"\x00" * (offset - graph_file.tell()))
+            graph_file.write(section)
+
+
+def read_binary(graph_path):
+    """
+    Open a graph saved in the binary format.
+
+    Parameters:
+        graph_path: string
+            The folder containing the graph file
+
+    Returns:
+        CompactGraph
+    """
+    from travers.graphs.compact_graph import CompactGraph
+
+    with open(Path(graph_path) / BINARY_FILE, "rb") as graph_file:
+        buffer = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(buffer)
+    magic, _, node_count, _, _, node_code, label_code = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"'{graph_path}' is not a travers binary graph")
+
+    sections = {}
+    for i, name in enumerate(_SECTIONS):
+        offset, length = _SECTION.unpack_from(view, _HEADER.size + _SECTION.size * i)
+        sections[name] = view[offset : offset + length]
+
+    node_code = node_code.decode()
+    label_code = label_code.decode()
+
+    nids = _NodeTable(
+        sections["nid_offsets"].cast("q"),
+        sections["nids"],
+        sections["nid_order"].cast(node_code),
+    )
+    return CompactGraph(
+        nids=nids,
+        nid_index=nids,
+        node_count=node_count,
+        labels=orjson.loads(sections["labels"]),
+        attributes=_AttributeTable(sections["attribute_offsets"].cast("q"), sections["attributes"]),
+        out_offsets=sections["out_offsets"].cast("q"),
+        out_targets=sections["out_targets"].cast(node_code),
+        out_relationships=sections["out_relationships"].cast(label_code),
+        in_offsets=sections["in_offsets"].cast("q"),
+        in_sources=sections["in_sources"].cast(node_code),
+        in_relationships=sections["in_relationships"].cast(label_code),
+    )
@@ -0,0 +1,155 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from array import array
+from collections.abc import MutableMapping
+
+MISSING = -1
+
+
+class ColumnarAttributes(MutableMapping):
+    """
+    Node attribute store, holding the attributes as columns rather than as a
+    dictionary per node.
+
+    Each node is given a row, each attribute key has a column which holds,
+    for each row, a code for the value of that attribute. The codes index a
+    dictionary of the distinct values for that key, so repeated values are
+    stored once. Nodes without an attribute have a code of -1. Rows of
+    removed nodes are reused.
+
+    The attributes of a node are rebuilt as a new dictionary when they are
+    read, changing that dictionary does not change the stored attributes.
+    Attributes which aren't dictionaries, or have values which can't be
+    hashed, are stored as they are.
+    """
+
+    __slots__ = ("_rows", "_free", "_size", "_columns", "_values", "_codes", "_others")
+
+    def __init__(self, nodes=None):
+        self._rows: dict = {}
+        self._free: list = []
+        self._size = 0
+        self._columns: dict = {}
+        self._values: dict = {}
+        self._codes: dict = {}
+        self._others: dict = {}
+        if nodes:
+            self.update(nodes)
+
+    def _can_encode(self, attributes):
+        """internal helper method, can the attributes be held in the columns"""
+        if not isinstance(attributes, dict):
+            return False
+        try:
+            for value in attributes.values():
+                hash(value)
+        except TypeError:
+            return False
+        return True
+
+    def _encode(self, key, value) -> int:
+        """internal helper method, the code for a value of an attribute"""
+        if key not in self._columns:
+            self._columns[key] = array("i", [MISSING]) * self._size
+            self._values[key] = []
+            self._codes[key] = {}
+        codes = self._codes[key]
+        # values which are equal but of different types (1, 1.0 and True)
+        # are given different codes so they are read back unchanged
+        typed_value = (type(value), value)
+        code = codes.get(typed_value)
+        if code is None:
+            code = codes[typed_value] = len(self._values[key])
+            self._values[key].append(value)
+        return code
+
+    def copy(self, deep: bool = False):
+        """
+        Copy the store, the columns are copied but the distinct values are
+        shared with this store.
+
+        Parameters:
+            deep: boolean (optional)
+                Also copy the attributes which aren't held in the columns
+        """
+        other = ColumnarAttributes()
+        other._rows = dict(self._rows)
+        other._free = list(self._free)
+        other._size = self._size
+        other._columns = {key: array("i", column) for key, column in self._columns.items()}
+        other._values = {key: list(values) for key, values in self._values.items()}
+        other._codes = {key: dict(codes) for key, codes in self._codes.items()}
+        other._others = dict(self._others)
+        if deep:
+            import copy
+
+            other._others = copy.deepcopy(self._others)
+        return other
+
+    def __getitem__(self, nid):
+        row = self._rows[nid]
+        if row is None:
+            return self._others[nid]
+        attributes = {}
+        for key, column in self._columns.items():
+            code = column[row]
+            if code != MISSING:
+                attributes[key] = self._values[key][code]
+        return attributes
+
+    def __setitem__(self, nid, attributes):
+        if nid in self._rows:
+            del self[nid]
+
+        if not self._can_encode(attributes):
+            self._rows[nid] = None
+            self._others[nid] = attributes
+            return
+
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = self._size
+            self._size += 1
+            for column in self._columns.values():
+                column.append(MISSING)
+        self._rows[nid] = row
+        for key, value in attributes.items():
+            code = self._encode(key, value)
+            self._columns[key][row] = code
+
+    def __delitem__(self, nid):
+        row = self._rows.pop(nid)
+        if row is None:
+            del self._others[nid]
+            return
+        for column in self._columns.values():
+            column[row] = MISSING
+        self._free.append(row)
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, nid):
+        return nid in self._rows
+
+    def __repr__(self):
+        return f"ColumnarAttributes - {len(self)} nodes, {len(self._columns)} columns"
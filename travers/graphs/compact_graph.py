@@ -0,0 +1,455 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from array import array
+from bisect import bisect_left
+from bisect import bisect_right
+from collections import deque
+from typing import List
+from typing import Tuple
+
+from travers.graphs import searches
+
+
+def _typecode(size: int) -> str:
+    """internal helper method, the smallest signed typecode which can index size items"""
+    if size < 2**31:
+        return "i"
+    return "q"  # pragma: no cover
+
+
+class CompactGraph:
+    """
+    Frozen Graph, optimized for memory and read-only traversal.
+
+    Node IDs and relationships are interned to integers, the node attributes
+    are held in a list indexed by the interned node ID. Edges are stored in
+    compressed sparse row (CSR) form in `array` buffers:
+        - offsets: for node i, its edges are in positions offsets[i] to
+          offsets[i + 1] of the targets and relationships arrays
+        - targets: the interned ID of the target node
+        - relationships: the interned relationship
+    Each node's edges are ordered by relationship so edges with a given
+    relationship can be found with a binary search. The same structure is
+    held for incoming edges.
+
+    Nodes which only appear in edges are interned after the nodes of the
+    Graph, they are traversable but are not reported by `nodes`. Node
+    attributes are shared with the Graph the CompactGraph was built from,
+    they are not copied.
+    """
+
+    __slots__ = (
+        "_nids",
+        "_nid_index",
+        "_node_count",
+        "_labels",
+        "_label_index",
+        "_attributes",
+        "_out_offsets",
+        "_out_targets",
+        "_out_relationships",
+        "_in_offsets",
+        "_in_sources",
+        "_in_relationships",
+        "_vector_engine",
+    )
+
+    def __init__(
+        self,
+        nids: list,
+        node_count: int,
+        labels: list,
+        attributes: list,
+        out_offsets: array,
+        out_targets: array,
+        out_relationships: array,
+        in_offsets: array,
+        in_sources: array,
+        in_relationships: array,
+        nid_index=None,
+    ):
+        """
+        Compact Directed Graph, use `from_graph` to build one.
+
+        Parameters:
+            nid_index: mapping (optional)
+                node ID to interned ID, built from the node IDs if not provided
+        """
+        self._nids = nids
+        if nid_index is None:
+            nid_index = {nid: i for i, nid in enumerate(nids)}
+        self._nid_index = nid_index
+        self._node_count = node_count
+        self._labels = labels
+        self._label_index = {label: i for i, label in enumerate(labels)}
+        self._attributes = attributes
+        self._out_offsets = out_offsets
+        self._out_targets = out_targets
+        self._out_relationships = out_relationships
+        self._in_offsets = in_offsets
+        self._in_sources = in_sources
+        self._in_relationships = in_relationships
+        self._vector_engine = None
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Build a CompactGraph from a Graph.
+
+        Parameters:
+            graph: Graph
+                The Graph to compact
+
+        Returns:
+            CompactGraph
+        """
+        nids = list(graph.nodes())
+        nid_index = {nid: i for i, nid in enumerate(nids)}
+        node_count = len(nids)
+        labels: list = []
+        label_index: dict = {}
+
+        # nodes which only appear in edges still need an ID
+        for source, target, relationship in graph.edges():
+            for nid in (source, target):
+                if nid not in nid_index:
+                    nid_index[nid] = len(nids)
+                    nids.append(nid)
+            if relationship not in label_index:
+                label_index[relationship] = len(labels)
+                labels.append(relationship)
+
+        node_code = _typecode(len(nids))
+        label_code = _typecode(len(labels))
+
+        out_offsets = array("q", [0])
+        out_targets = array(node_code)
+        out_relationships = array(label_code)
+        in_degrees = [0] * len(nids)
+
+        for nid in nids:
+            row = sorted(
+                ((label_index[r], nid_index[t]) for _, t, r in graph.outgoing_edges(nid)),
+                key=lambda edge: edge[0],
+            )
+            for relationship, target in row:
+                out_relationships.append(relationship)
+                out_targets.append(target)
+                in_degrees[target] += 1
+            out_offsets.append(len(out_targets))
+
+        in_offsets = array("q", [0])
+        for degree in in_degrees:
+            in_offsets.append(in_offsets[-1] + degree)
+        in_sources = array(node_code, bytes(out_targets.itemsize * len(out_targets)))
+        in_relationships = array(label_code, bytes(out_relationships.itemsize * len(out_targets)))
+        cursors = list(in_offsets[:-1])
+        for source in range(len(nids)):
+            for position in range(out_offsets[source], out_offsets[source + 1]):
+                target = out_targets[position]
+                in_sources[cursors[target]] = source
+                in_relationships[cursors[target]] = out_relationships[position]
+                cursors[target] += 1
+
+        attributes = [graph[nid] for nid in nids]
+
+        return cls(
+            nids=nids,
+            node_count=node_count,
+            labels=labels,
+            attributes=attributes,
+            out_offsets=out_offsets,
+            out_targets=out_targets,
+            out_relationships=out_relationships,
+            in_offsets=in_offsets,
+            in_sources=in_sources,
+            in_relationships=in_relationships,
+        )
+
+    def save(self, graph_path):
+        """
+        Persist the graph to storage in the binary format, saved graphs are
+        opened with `travers.load`.
+
+        Parameters:
+            graph_path: string
+                The folder to save the graph file to
+        """
+        from travers.graphs.binary_format import write_binary
+
+        write_binary(self, graph_path)
+
+    def vector_engine(self):
+        """
+        The NumPy views of the graph used by vectorised traversals, these are
+        created the first time they are needed.
+        """
+        if self._vector_engine is None:
+            from travers.graphs.vector_traversal import VectorEngine
+
+            self._vector_engine = VectorEngine(self)
+        return self._vector_engine
+
+    def _row(self, index: int, relationship) -> Tuple[int, int]:
+        """internal helper method, the span of a node's edges with a relationship"""
+        start = self._out_offsets[index]
+        end = self._out_offsets[index + 1]
+        code = self._label_index.get(relationship)
+        if code is None:
+            return start, start
+        relationships = self._out_relationships
+        return (
+            bisect_left(relationships, code, start, end),
+            bisect_right(relationships, code, start, end),
+        )
+
+    def _neighbours(self, index: int):
+        """internal helper method, the interned targets of a node's edges"""
+        return self._out_targets[self._out_offsets[index] : self._out_offsets[index + 1]]
+
+    def _in_neighbours(self, index: int):
+        """internal helper method, the interned sources of a node's incoming edges"""
+        return self._in_sources[self._in_offsets[index] : self._in_offsets[index + 1]]
+
+    def nodes(self, data=False):
+        """
+        The nodes which comprise the graph
+
+        Parameters:
+            data: boolean (optional)
+                if True return the details of the nodes, if False just return
+                the list of node IDs
+
+        Returns:
+            List
+        """
+        count = self._node_count
+        if data:
+            return list(zip(self._nids[:count], self._attributes[:count]))
+        return self._nids[:count]
+
+    def edges(self):
+        """
+        The edges which comprise the graph
+
+        Returns:
+            Generator of Tuples of (Source, Target and Relationship)
+        """
+        nids = self._nids
+        labels = self._labels
+        for index, source in enumerate(nids):
+            for position in range(self._out_offsets[index], self._out_offsets[index + 1]):
+                yield (
+                    source,
+                    nids[self._out_targets[position]],
+                    labels[self._out_relationships[position]],
+                )
+
+    def outgoing_edges(self, source, *relationships) -> List[Tuple]:
+        """
+        Get the list of edges traversable from a given node.
+
+        Parameters:
+            source: string
+                The node to get the outgoing edges for
+            relationships: strings (optional)
+                Only return edges with these relationships, if not provided
+                all outgoing edges are returned
+
+        Returns:
+            List of Tuples (Source, Target, Relationship)
+        """
+        index = self._nid_index.get(source)
+        if index is None:
+            return []
+        nids = self._nids
+        targets = self._out_targets
+        if relationships:
+            results = []
+            for relationship in relationships:
+                start, end = self._row(index, relationship)
+                results += [(source, nids[targets[p]], relationship) for p in range(start, end)]
+            return results
+        labels = self._labels
+        return [
+            (source, nids[targets[p]], labels[self._out_relationships[p]])
+            for p in range(self._out_offsets[index], self._out_offsets[index + 1])
+        ]
+
+    def outgoing_relationships(self, source) -> List:
+        """
+        Get the relationships of the edges traversable from a given node.
+
+        Parameters:
+            source: string
+                The node to get the relationships for
+
+        Returns:
+            List of relationships
+        """
+        index = self._nid_index.get(source)
+        if index is None:
+            return []
+        codes = self._out_relationships[self._out_offsets[index] : self._out_offsets[index + 1]]
+        return [self._labels[code] for code in sorted(set(codes))]
+
+    def ingoing_edges(self, target, *relationships) -> List[Tuple]:
+        """
+        Get the list of edges which can traverse to a given node.
+
+        Parameters:
+            target: string
+                The node to get the incoming edges for
+            relationships: strings (optional)
+                Only return edges with these relationships, if not provided
+                all incoming edges are returned
+
+        Returns:
+            List of Tuples (Source, Target, Relationship)
+        """
+        index = self._nid_index.get(target)
+        if index is None:
+            return []
+        nids = self._nids
+        labels = self._labels
+        edges = [
+            (nids[self._in_sources[p]], target, labels[self._in_relationships[p]])
+            for p in range(self._in_offsets[index], self._in_offsets[index + 1])
+        ]
+        if relationships:
+            return [edge for edge in edges if edge[2] in relationships]
+        return edges
+
+    def breadth_first_search(self, source: str, depth: int = 100):
+        """
+        Search a tree for nodes we can walk to from a given node.
+
+        Parameters:
+            source: string
+                The node to walk from
+            depth: integer
+                The maximum distance to walk from source
+        Returns:
+            List of Tuples (Source, Target, Relationship) of the traversed edges
+        """
+        start = self._nid_index.get(source)
+        if start is None:
+            return []
+
+        nids = self._nids
+        labels = self._labels
+        offsets = self._out_offsets
+        targets = self._out_targets
+        relationships = self._out_relationships
+
+        visited = {start}
+        queue = deque([(start, 0)])
+        traversed_edges = []
+
+        while queue:
+            current_node, current_depth = queue.popleft()
+
+            if current_depth < depth:
+                for position in range(offsets[current_node], offsets[current_node + 1]):
+                    target = targets[position]
+                    traversed_edges.append(
+                        (nids[current_node], nids[target], labels[relationships[position]])
+                    )
+                    if target not in visited:
+                        visited.add(target)
+                        queue.append((target, current_depth + 1))
+
+        return traversed_edges
+
+    def shortest_path(self, start: str, end: str, bidirectional: bool = False) -> List[str]:
+        """
+        Compute the shortest path from start to end node.
+
+        Parameters:
+            start: string
+                The starting node ID
+            end: string
+                The target node ID
+            bidirectional: boolean (optional)
+                Search from both the start and the end node, this explores
+                fewer nodes on large graphs
+
+        Returns:
+            List of node IDs from start to end node that represent the shortest path.
+            Returns an empty list if no path is found.
+        """
+        if start == end:
+            return [start]
+
+        first = self._nid_index.get(start)
+        last = self._nid_index.get(end)
+        if first is None or last is None:
+            return []
+
+        if bidirectional:
+            path = searches.bidirectional_shortest_path(
+                first, last, self._neighbours, self._in_neighbours
+            )
+        else:
+            path = searches.shortest_path(first, last, self._neighbours)
+        return [self._nids[index] for index in path]
+
+    @property
+    def query_cache(self):
+        """
+        CompactGraphs do not cache queries, see `Graph.enable_query_cache`.
+        """
+        return None
+
+    def attribute_index(self, key):
+        """
+        CompactGraphs do not index attributes, see `Graph.attribute_index`.
+        """
+        return None
+
+    def find_nodes(self, key, value) -> List:
+        """
+        Get the nodes with a given attribute value.
+
+        Parameters:
+            key: string
+                The attribute
+            value: any
+                The value to match
+
+        Returns:
+            List of node IDs
+        """
+        return [
+            nid
+            for nid, node in self.nodes(data=True)
+            if isinstance(node, dict) and key in node and node[key] == value
+        ]
+
+    def __repr__(self):
+        return f"CompactGraph - {len(self)} nodes, {len(self._out_targets)} edges"
+
+    def __len__(self):
+        return self._node_count
+
+    def __getitem__(self, nid):
+        index = self._nid_index.get(nid)
+        if index is None:
+            return None
+        return self._attributes[index]
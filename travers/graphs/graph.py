@@ -16,35 +16,82 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+from collections.abc import MutableMapping
+from contextlib import ExitStack
 from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Optional
 from typing import Tuple
+from typing import Union
 
 import orjson
+from travers.errors import CyclicGraphError
 from travers.errors import MissingDependencyError
+from travers.errors import ReadOnlyGraphError
+from travers.graphs import searches
+from travers.graphs.binary_format import BINARY_FILE
+from travers.graphs.columnar import ColumnarAttributes
+from travers.graphs.mutation_log import LOG_FILE
+from travers.graphs.mutation_log import MutationLog
+from travers.graphs.mutation_log import is_open
+from travers.graphs.query_cache import QueryCache
+
+MANIFEST_FILE = "manifest.json"
+
+
+def index_adjacency(edges: dict):
+    """
+    Build the reverse and relationship indexes for adjacency lists in one pass.
+
+    Parameters:
+        edges: dictionary
+            source to a dictionary of (target, relationship) tuples
+
+    Returns:
+        Tuple of the reverse index and the relationship index
+    """
+    inbound: dict = {}
+    relationships: dict = {}
+    for source, records in edges.items():
+        related = relationships[source] = {}
+        for record in records:
+            target, relationship = record
+            records_in = inbound.get(target)
+            if records_in is None:
+                records_in = inbound[target] = {}
+            records_in[(source, relationship)] = None
+            targets = related.get(relationship)
+            if targets is None:
+                targets = related[relationship] = {}
+            targets[target] = None
+    return inbound, relationships
 
 
 def print_tree_inner(tree, prefix="", last=True):
     """
     Prints a nested dictionary as an ascii tree
     """
+    stack = [(tree, prefix, last)]
+    while stack:
+        tree, prefix, last = stack.pop()
 
-    yield prefix
-    if last:
-        yield "└─ "
-        prefix += "   "
-    else:
-        yield "├─ "
-        prefix += "│  "
+        yield prefix
+        if last:
+            yield "└─ "
+            prefix += "   "
+        else:
+            yield "├─ "
+            prefix += "│  "
 
-    yield str(tree["node"]) + "\n"
+        yield str(tree["node"]) + "\n"
 
-    # Recursively print the children
-    count = len(tree["children"])
-    for i, child in enumerate(tree["children"]):
-        last = i == count - 1
-        yield from print_tree_inner(child, prefix, last)
+        # add the children so the first is printed next
+        count = len(tree["children"])
+        for i in range(count - 1, -1, -1):
+            stack.append((tree["children"][i], prefix, i == count - 1))
 
 
 class Graph(object):
@@ -57,18 +104,190 @@ class Graph(object):
         - the target node
         - the relationship
     The target and the relationship are stored as a tuple, the edge dictionary
-    stores lists of tuples.
-
+    stores an insertion-ordered dictionary of these tuples (the values are
+    unused) for each source, this deduplicates edges and makes adding and
+    removing an edge constant time.
+
+    Two indexes are maintained alongside the edges:
+        - a reverse index, keyed by the target node, so incoming edges can be
+          found without scanning every edge
+        - a relationship index, keyed by the source node and then the
+          relationship, so edges with a given relationship can be found
+          without scanning every outgoing edge
+    The nodes with outgoing but no incoming edges (entry points), and with
+    incoming but no outgoing edges (exit points), are also tracked as edges
+    are added and removed.
+
+    Node attributes can optionally be held in columns (see ColumnarAttributes)
+    and attributes can be indexed so nodes with a given value can be found
+    without scanning every node.
+
+    Read-only snapshots of the Graph share its edges, nodes and indexes. Once
+    a snapshot has been taken, changes to the Graph are copy-on-write: the
+    first change copies the top level of each index and the containers for
+    each node are copied the first time they are changed, so the snapshot
+    never sees a change.
     """
 
-    __slots__ = ("_nodes", "_edges")
-
-    def __init__(self):
+    __slots__ = (
+        "_nodes",
+        "_edges",
+        "_inbound",
+        "_relationships",
+        "_entry_points",
+        "_exit_points",
+        "_attribute_indexes",
+        "_version",
+        "_query_cache",
+        "_frozen",
+        "_shared",
+        "_owned",
+        "_log",
+        "_compacted",
+    )
+
+    def __init__(self, columnar: bool = False):
         """
         Directed Graph.
+
+        Parameters:
+            columnar: boolean (optional)
+                Store node attributes in columns, this uses much less memory
+                for nodes with dictionaries of repetitive attributes
         """
-        self._nodes = {}
+        self._nodes: MutableMapping = {}
+        if columnar:
+            self._nodes = ColumnarAttributes()
         self._edges = {}
+        self._inbound = {}
+        self._relationships = {}
+        self._entry_points = set()
+        self._exit_points = set()
+        self._attribute_indexes: dict = {}
+        self._version = 0
+        self._query_cache: Optional[QueryCache] = None
+        self._frozen = False
+        self._shared = False
+        self._owned: Optional[set] = None
+        self._log: Optional[MutationLog] = None
+        self._compacted: Optional[tuple] = None
+
+    def _unshare(self):
+        """internal helper method, prepare the Graph to be changed"""
+        if self._frozen:
+            raise ReadOnlyGraphError("Graph snapshots cannot be changed")
+        if not self._shared:
+            return
+        # copy the top level of each index, the containers for each node are
+        # copied by _private when they are changed
+        self._nodes = self._nodes.copy()
+        self._edges = dict(self._edges)
+        self._inbound = dict(self._inbound)
+        self._relationships = dict(self._relationships)
+        self._entry_points = set(self._entry_points)
+        self._exit_points = set(self._exit_points)
+        self._attribute_indexes = {
+            key: dict(index) for key, index in self._attribute_indexes.items()
+        }
+        self._shared = False
+
+    def _private(self, index: dict, key, create: bool = False):
+        """internal helper method, get a container from an index which isn't shared"""
+        container = index.get(key)
+        if self._owned is None:
+            if container is None and create:
+                container = index[key] = {}
+            return container
+        if container is None:
+            if not create:
+                return None
+            container = index[key] = {}
+        elif id(container) not in self._owned:
+            container = index[key] = container.copy()
+        self._owned.add(id(container))
+        return container
+
+    def _classify(self, nid):
+        """internal helper method, update the entry and exit points for a node"""
+        has_outgoing = nid in self._edges
+        has_incoming = nid in self._inbound
+        if has_outgoing and not has_incoming:
+            self._entry_points.add(nid)
+        else:
+            self._entry_points.discard(nid)
+        if has_incoming and not has_outgoing:
+            self._exit_points.add(nid)
+        else:
+            self._exit_points.discard(nid)
+
+    def _index_edge(self, source, target, relationship):
+        """internal helper method, record an edge in the indexes"""
+        self._version += 1
+        self._private(self._inbound, target, create=True)[(source, relationship)] = None
+        relationships = self._private(self._relationships, source, create=True)
+        self._private(relationships, relationship, create=True)[target] = None
+        self._classify(source)
+        self._classify(target)
+
+    def _unindex_edge(self, source, target, relationship):
+        """internal helper method, remove an edge from the indexes"""
+        self._version += 1
+        records = self._private(self._inbound, target)
+        if records is not None:
+            records.pop((source, relationship), None)
+            if not records:
+                del self._inbound[target]
+        relationships = self._private(self._relationships, source)
+        if relationships is not None:
+            targets = self._private(relationships, relationship)
+            if targets is not None:
+                targets.pop(target, None)
+                if not targets:
+                    del relationships[relationship]
+            if not relationships:
+                del self._relationships[source]
+        self._classify(source)
+        self._classify(target)
+
+    def _index_node(self, nid, node):
+        """internal helper method, record a node in the attribute indexes"""
+        if not isinstance(node, dict):
+            return
+        for key, index in self._attribute_indexes.items():
+            if key in node:
+                try:
+                    self._private(index, node[key], create=True)[nid] = None
+                except TypeError:  # values which can't be hashed aren't indexed
+                    pass
+
+    def _unindex_node(self, nid):
+        """internal helper method, remove a node from the attribute indexes"""
+        node = self._nodes.get(nid)
+        if not isinstance(node, dict):
+            return
+        for key, index in self._attribute_indexes.items():
+            if key in node:
+                try:
+                    nids = self._private(index, node[key])
+                except TypeError:
+                    continue
+                if nids is not None:
+                    nids.pop(nid, None)
+                    if not nids:
+                        del index[node[key]]
+
+    def _build_indexes(self):
+        """internal helper method, rebuild the indexes from the edges"""
+        self._set_indexes(*index_adjacency(self._edges))
+
+    def _set_indexes(self, inbound: dict, relationships: dict):
+        """internal helper method, replace the indexes with ones built from the edges"""
+        self._unshare()
+        self._inbound = inbound
+        self._relationships = relationships
+        self._entry_points = self._edges.keys() - inbound.keys()
+        self._exit_points = inbound.keys() - self._edges.keys()
+        self._version += 1
 
     def _make_a_list(self, obj):
         """internal helper method"""
@@ -76,29 +295,106 @@ class Graph(object):
             return obj
         return [obj]
 
-    def save(self, graph_path):  # pragma: nocover
+    def save(self, graph_path, shards: int = 1):  # pragma: nocover
         """
         Persist a graph to storage. It saves nodes and edges to separate files.
 
         Parameters:
             graph_path: string
                 The folder ?to save the node and edge files to
+            shards: integer (optional)
+                The number of part files to split the nodes and the edges
+                across, when more than one a manifest listing the parts is
+                written so they can be loaded in parallel
         """
         path = Path(graph_path)
+        # the log is removed unless it is this Graph's, so no other Graph can be writing to it
+        log_path = (path / LOG_FILE).resolve()
+        own_log = self._log is not None and self._log.path == log_path
+        if not own_log and is_open(log_path):
+            raise ValueError(
+                f"the mutation log in '{graph_path}' is attached to a Graph, detach it first"
+            )
         path.mkdir(exist_ok=True)
-
-        with open(path / "edges.jsonl", "wb") as edge_file:
-            for source, target, relationship in self.edges():
-                edge_record = {
-                    "source": source,
-                    "target": target,
-                    "relationship": relationship,
-                }
-                edge_file.write(orjson.dumps(edge_record) + b"\n")
-        with open(path / "nodes.jsonl", "wb") as node_file:
-            for nid, attr in self.nodes(data=True):
+        # load reads a binary graph in preference to the node and edge files
+        (path / BINARY_FILE).unlink(missing_ok=True)
+
+        if shards > 1:
+            edge_files = [f"edges-{i:05}.jsonl" for i in range(shards)]
+            node_files = [f"nodes-{i:05}.jsonl" for i in range(shards)]
+        else:
+            (path / MANIFEST_FILE).unlink(missing_ok=True)
+            edge_files = ["edges.jsonl"]
+            node_files = ["nodes.jsonl"]
+        # remove the files of an earlier save which this save won't replace
+        written = {*edge_files, *node_files}
+        previous = [
+            path / "nodes.jsonl",
+            path / "edges.jsonl",
+            *path.glob("nodes-*.jsonl"),
+            *path.glob("edges-*.jsonl"),
+        ]
+        for old in previous:
+            if old.name not in written:
+                old.unlink(missing_ok=True)
+
+        with ExitStack() as stack:
+            parts = [stack.enter_context(open(path / name, "wb")) for name in edge_files]
+            # edges are split by source so each part holds whole adjacency lists,
+            # each part holds a range of sources so the order is kept when loaded
+            for i, (source, records) in enumerate(self._edges.items()):
+                edge_file = parts[i * len(parts) // len(self._edges)]
+                for target, relationship in records:
+                    edge_record = {
+                        "source": source,
+                        "target": target,
+                        "relationship": relationship,
+                    }
+                    edge_file.write(orjson.dumps(edge_record) + b"\n")
+        with ExitStack() as stack:
+            parts = [stack.enter_context(open(path / name, "wb")) for name in node_files]
+            for i, (nid, attr) in enumerate(self.nodes(data=True)):
+                node_file = parts[i * len(parts) // len(self._nodes)]
                 node_file.write(orjson.dumps({"nid": nid, "attributes": attr}) + b"\n")
 
+        if shards > 1:
+            manifest = {"shards": shards, "nodes": node_files, "edges": edge_files}
+            with open(path / MANIFEST_FILE, "wb") as manifest_file:
+                manifest_file.write(orjson.dumps(manifest))
+
+        # the saved graph includes the logged changes
+        if own_log:
+            self._log.truncate()
+        else:
+            (path / LOG_FILE).unlink(missing_ok=True)
+
+    def attach_log(self, graph_path, sync: bool = False):
+        """
+        Append the changes made to the Graph to a log in a folder, `load`
+        replays the changes in the log over the Graph saved in the folder so
+        small changes can be persisted without saving the whole Graph.
+
+        The log is emptied when the Graph is saved to the same folder.
+
+        Parameters:
+            graph_path: string
+                The folder to write the log to
+            sync: boolean (optional)
+                Wait for each change to be written to disk
+        """
+        path = Path(graph_path)
+        path.mkdir(exist_ok=True)
+        self.detach_log()
+        self._log = MutationLog(path / LOG_FILE, sync)
+
+    def detach_log(self):
+        """
+        Stop logging changes to the Graph.
+        """
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
     def add_edge(self, source: str, target: str, relationship: Optional[str] = None):
         """
         Add edge to the graph
@@ -119,15 +415,16 @@ class Graph(object):
             print("Trying to create edge with undefined nodes")
             return False
 
-        # Check for existing edges and add the new one
-        existing_edges = list(self._edges.get(source, ()))
+        self._unshare()
+        existing_edges = self._private(self._edges, source, create=True)
 
         # Avoid adding duplicate edges
         edge_to_add = (target, relationship)
         if edge_to_add not in existing_edges:
-            existing_edges.append(edge_to_add)
-
-        self._edges[source] = tuple(existing_edges)
+            existing_edges[edge_to_add] = None
+            self._index_edge(source, target, relationship)
+            if self._log is not None:
+                self._log.record("add_edge", source, target, relationship)
 
     def add_node(self, nid: str, node):
         """
@@ -139,7 +436,104 @@ class Graph(object):
             attributes: dictionary (optional)
                 The attributes of the node
         """
+        self._unshare()
+        if self._attribute_indexes:
+            self._unindex_node(nid)
+            self._index_node(nid, node)
         self._nodes[nid] = node
+        self._version += 1
+        if self._log is not None:
+            self._log.record("add_node", nid, node)
+
+    @property
+    def version(self) -> int:
+        """
+        Counter of the changes to the Graph, it increases every time a node
+        or an edge is added, changed or removed.
+
+        Changes made directly to the attributes returned for a node are not
+        counted, replace the node's attributes with `add_node` instead.
+        """
+        return self._version
+
+    def enable_query_cache(self, maxsize: int = 128) -> QueryCache:
+        """
+        Cache the results of lazy traversals (see `walk`) of the Graph,
+        cached results are discarded when the Graph changes.
+
+        Parameters:
+            maxsize: integer (optional)
+                The number of results to cache, 0 disables the cache
+
+        Returns:
+            QueryCache
+        """
+        self._query_cache = QueryCache(maxsize) if maxsize > 0 else None
+        return self._query_cache
+
+    @property
+    def query_cache(self) -> Optional[QueryCache]:
+        return self._query_cache
+
+    def index_attribute(self, key):
+        """
+        Index the nodes by the value of an attribute, the index is kept up to
+        date as nodes are added and removed. Values which can't be hashed are
+        not indexed.
+
+        Parameters:
+            key: string
+                The attribute to index
+        """
+        self._unshare()
+        self._attribute_indexes[key] = {}
+        for nid, node in self._nodes.items():
+            if isinstance(node, dict) and key in node:
+                try:
+                    self._attribute_indexes[key].setdefault(node[key], {})[nid] = None
+                except TypeError:
+                    pass
+
+    def attribute_index(self, key) -> Optional[dict]:
+        """
+        Get the index of an attribute, if the attribute has been indexed.
+
+        Parameters:
+            key: string
+                The attribute
+
+        Returns:
+            Dictionary of the attribute's values to dictionaries of the node
+            IDs with that value (the values are unused), or None
+        """
+        return self._attribute_indexes.get(key)
+
+    def find_nodes(self, key, value) -> List:
+        """
+        Get the nodes with a given attribute value, using the attribute's
+        index if it has one.
+
+        Parameters:
+            key: string
+                The attribute
+            value: any
+                The value to match
+
+        Returns:
+            List of node IDs
+        """
+        index = self._attribute_indexes.get(key)
+        if index is not None:
+            try:
+                return list(index.get(value, ()))
+            except TypeError:
+                # values which can't be hashed can't be looked up, so read the nodes
+                pass
+        return [
+            nid
+            for nid, node in self._nodes.items()
+            if isinstance(node, dict) and key in node and node[key] == value
+        ]
 
     def nodes(self, data=False):
         """
@@ -177,35 +571,93 @@ class Graph(object):
             depth: integer
                 The maximum distance to walk from source
         Returns:
+            List of Tuples (Source, Target, Relationship) of the traversed edges
+        """
+        return list(self.breadth_first_edges(source, depth))
+
+    def breadth_first_edges(
+        self,
+        source: str,
+        depth: int = 100,
+        relationships: Optional[Iterable] = None,
+        stop_when: Optional[Callable] = None,
+        max_nodes: Optional[int] = None,
+    ):
+        """
+        Lazily search for the edges we can walk from a given node, nearest first.
+
+        Edges are yielded as they are found, so the search can be abandoned as
+        soon as the caller has what it needs.
+
+        Parameters:
+            source: string
+                The node to walk from
+            depth: integer (optional)
+                The maximum distance to walk from source
+            relationships: string or Iterable (optional)
+                Only walk edges with these relationships
+            stop_when: Callable (optional)
+                Called with each edge after it has been yielded, the search
+                stops when it returns True
+            max_nodes: integer (optional)
+                The maximum number of nodes to visit, including the source
+
+        Returns:
+            Generator of Tuples (Source, Target, Relationship)
         """
         from collections import deque
 
+        if isinstance(relationships, str):
+            relationships = (relationships,)
+        # each edge is yielded once, even if its relationship is listed twice
+        relationships = tuple(dict.fromkeys(relationships or ()))
         visited = {source}
         queue = deque([(source, 0)])
 
-        traversed_edges = []
-
         while queue:
             current_node, current_depth = queue.popleft()
 
             if current_depth < depth:
-                for edge in self.outgoing_edges(current_node):
+                for edge in self.outgoing_edges(current_node, *relationships):
                     _, target, _ = edge
 
-                    # Add the edge to the traversed edges list
-                    traversed_edges.append(edge)
+                    is_new = target not in visited
+                    if is_new and max_nodes is not None and len(visited) >= max_nodes:
+                        return
+
+                    yield edge
 
-                    if target not in visited:
+                    if stop_when is not None and stop_when(edge):
+                        return
+
+                    if is_new:
                         visited.add(target)
                         queue.append((target, current_depth + 1))
 
-        return traversed_edges
-
-    def depth_first_search(
+    def depth_first_events(
         self, node: Optional[str] = None, visited: Optional[set] = None, depth: int = 0
     ):
         """
-        Returns a nested dictionary representing the graph as a tree
+        Walk the graph depth first, against the direction of the edges, yielding
+        each node as it is reached.
+
+        An explicit stack is used so very deep graphs do not exhaust the
+        recursion limit.
+
+        Parameters:
+            node: string (optional)
+                The node to walk from, defaults to the first exit point
+            visited: set (optional)
+                Nodes which should not be walked to, updated as nodes are walked
+            depth: integer (optional)
+                The depth of the starting node
+
+        Returns:
+            Generator of Tuples of (Node, Depth, Relationship), the relationship
+            is the relationship of the edge walked to reach the node, None for
+            the starting node. The incoming edges of each node are walked in
+            the order `ingoing_edges` returns them, which isn't kept when the
+            Graph is saved and loaded.
         """
         if node is None:
             node = self.get_exit_points()[0]
@@ -214,77 +666,152 @@ class Graph(object):
             visited = set()
 
         visited.add(node)
+        yield node, depth, None
+
+        stack = [(iter(self.ingoing_edges(node)), depth)]
+        while stack:
+            edges, current_depth = stack[-1]
+            for neighbor, _, relationship in edges:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    yield neighbor, current_depth + 1, relationship
+                    stack.append((iter(self.ingoing_edges(neighbor)), current_depth + 1))
+                    break
+            else:
+                stack.pop()
 
-        tree: dict = {
-            "type": str(self[node].node_type),
-            "node": str(self[node]),
-            "name": node,
-            "depth": depth,
-            "children": [],
-        }
-
-        for neighbor, _, relationship in self.ingoing_edges(node):
-            if neighbor not in visited:
-                child = self.depth_first_search(neighbor, visited, depth + 1)
-                child["relationship"] = relationship
-                tree["children"].append(child)  # type:ignore
-
-        return tree
-
-    def outgoing_edges(self, source) -> List[Tuple]:
+    def depth_first_search(
+        self, node: Optional[str] = None, visited: Optional[set] = None, depth: int = 0
+    ):
+        """
+        Returns a nested dictionary representing the graph as a tree
+        """
+        # the trees of the nodes on the current branch, indexed by depth
+        branch: list = []
+
+        for nid, node_depth, relationship in self.depth_first_events(node, visited, depth):
+            tree: dict = {
+                "type": str(self[nid].node_type),
+                "node": str(self[nid]),
+                "name": nid,
+                "depth": node_depth,
+                "children": [],
+            }
+            level = node_depth - depth
+            del branch[level:]
+            if branch:
+                tree["relationship"] = relationship
+                branch[-1]["children"].append(tree)
+            branch.append(tree)
+
+        return branch[0]
+
+    def outgoing_edges(self, source, *relationships) -> List[Tuple]:
         """
         Get the list of edges traversable from a given node.
 
         Parameters:
             source: string
                 The node to get the outgoing edges for
+            relationships: strings (optional)
+                Only return edges with these relationships, if not provided
+                all outgoing edges are returned
 
         Returns:
             Set of Tuples (Source, Target, Relationship)
         """
-        return [(source, t, r) for t, r in self._edges.get(source, tuple())]
+        if relationships:
+            indexed = self._relationships.get(source, {})
+            return [(source, t, r) for r in relationships for t in indexed.get(r, ())]
+        return [(source, t, r) for t, r in self._edges.get(source, ())]
+
+    def outgoing_relationships(self, source) -> List:
+        """
+        Get the relationships of the edges traversable from a given node.
+
+        Parameters:
+            source: string
+                The node to get the relationships for
+
+        Returns:
+            List of relationships
+        """
+        return list(self._relationships.get(source, ()))
 
-    def ingoing_edges(self, target) -> List[Tuple]:
+    def ingoing_edges(self, target, *relationships) -> List[Tuple]:
         """
         Get the list of edges which can traverse to a given node.
 
         Parameters:
             target: string
                 The node to get the incoming edges for
+            relationships: strings (optional)
+                Only return edges with these relationships, if not provided
+                all incoming edges are returned
 
         Returns:
-            Set of Tuples (Source, Target, Relationship)
+            List of Tuples (Source, Target, Relationship). The order depends on
+            how the Graph was built and isn't kept when it is saved and loaded;
+            the edges of a loaded Graph are in the order of their source node,
+            edges added to a Graph follow in the order they were added. So
+            `depth_first_search` and `draw` may order nodes differently after
+            a Graph is saved and loaded, and differently to older versions,
+            which always returned edges in the order of their source node.
         """
-        return [(s, t, r) for s, t, r in self.edges() if t == target]
+        inbound = self._inbound.get(target, {})
+        if relationships:
+            return [(s, target, r) for s, r in inbound if r in relationships]
+        return [(s, target, r) for s, r in inbound]
 
     def is_acyclic(self):
         """
         Test if the Graph is acyclic
         """
-        # cycle over the graph removing a layer of exits each cycle
-        # if we have nodes but no exists, we're cyclic
+        try:
+            self.topological_generations()
+        except CyclicGraphError:
+            return False
+        return True
 
-        # rebuild the edge information
-        my_edges = list(self.edges())
+    def topological_generations(self) -> List[List]:
+        """
+        Group the nodes of the Graph into generations, every edge goes from a
+        node in an earlier generation to a node in a later generation.
+
+        Returns:
+            List of lists of node IDs
 
-        while len(my_edges) > 0:
-            # find all of the exits
-            sources = {source for source, target, direction in my_edges}
-            exits = {target for source, target, direction in my_edges if target not in sources}
+        Raises:
+            CyclicGraphError: the Graph contains a cycle
+        """
+        edges = self._edges
+        inbound = self._inbound
 
-            if len(exits) == 0:
-                return False
+        # include nodes which only appear in edges
+        nodes = dict.fromkeys(self._nodes)
+        nodes.update(dict.fromkeys(edges))
+        nodes.update(dict.fromkeys(inbound))
 
-            # remove the exits
-            new_edges = [
-                (source, target, direction)
-                for source, target, direction in my_edges
-                if target not in exits
-            ]
-            my_edges = new_edges
-        return True
+        return searches.topological_generations(
+            nodes,
+            lambda node: (target for target, _ in edges.get(node, ())),
+            lambda node: len(inbound.get(node, ())),
+        )
 
-    def shortest_path(self, start: str, end: str) -> List[str]:
+    def topological_sort(self) -> List:
+        """
+        Order the nodes of the Graph so every edge goes from a node to a node
+        later in the order.
+
+        Returns:
+            List of node IDs
+
+        Raises:
+            CyclicGraphError: the Graph contains a cycle
+        """
+        return [node for generation in self.topological_generations() for node in generation]
+
+    def shortest_path(self, start: str, end: str, bidirectional: bool = False) -> List[str]:
         """
         Compute the shortest path from start to end node.
 
@@ -293,36 +820,110 @@ class Graph(object):
                 The starting node ID
             end: string
                 The target node ID
+            bidirectional: boolean (optional)
+                Search from both the start and the end node, this explores
+                fewer nodes on large graphs
 
         Returns:
             List of node IDs from start to end node that represent the shortest path.
             Returns an empty list if no path is found.
         """
+        edges = self._edges
 
-        from collections import deque
+        def successors(node):
+            return (target for target, _ in edges.get(node, ()))
 
-        visited = set()
-        queue = deque([(start, [start])])  # Each item in the queue is a tuple (node, path_so_far)
+        if not bidirectional:
+            return searches.shortest_path(start, end, successors)
 
-        while queue:
-            node, path = queue.popleft()
+        inbound = self._inbound
+
+        def predecessors(node):
+            return (source for source, _ in inbound.get(node, ()))
+
+        return searches.bidirectional_shortest_path(start, end, successors, predecessors)
+
+    def _weighted_edges(self, weight: Union[None, dict, Callable]) -> Callable:
+        """internal helper method, a function returning the (target, cost) of a node's edges"""
+        edges = self._edges
+        if weight is None:
+            return lambda node: ((target, 1) for target, _ in edges.get(node, ()))
+
+        if callable(weight):
+
+            def weighted_edges(node):
+                for target, relationship in edges.get(node, ()):
+                    cost = weight(node, target, relationship)
+                    if cost is not None:
+                        yield target, cost
 
-            if node == end:
-                return path  # Found a path to the end node
+            return weighted_edges
 
-            if node not in visited:
-                visited.add(node)
+        relationships = self._relationships
 
-                for _, neighbor, _ in self.outgoing_edges(node):
-                    if neighbor == end:
-                        path.append(neighbor)
-                        return path
-                    if neighbor not in visited:
-                        new_path = list(path)
-                        new_path.append(neighbor)
-                        queue.append((neighbor, new_path))
+        def related_edges(node):
+            # only the edges with a weighted relationship are visited
+            indexed = relationships.get(node, {})
+            for relationship, cost in weight.items():
+                for target in indexed.get(relationship, ()):
+                    yield target, cost
 
-        return []  # No path found
+        return related_edges
+
+    def cheapest_path(
+        self,
+        start: str,
+        end: str,
+        weight: Union[None, dict, Callable] = None,
+        heuristic: Optional[Callable] = None,
+    ) -> Tuple[float, List[str]]:
+        """
+        Compute the lowest cost path from start to end node.
+
+        Parameters:
+            start: string
+                The starting node ID
+            end: string
+                The target node ID
+            weight: dictionary or Callable (optional)
+                The cost of each edge, either a dictionary of relationship to
+                cost, where edges with other relationships are not followed,
+                or a function taking the source, target and relationship and
+                returning the cost, or None to not follow the edge. If not
+                provided every edge costs 1
+            heuristic: Callable (optional)
+                Estimates the cost from a node ID to the end node, providing a
+                heuristic uses A* rather than Dijkstra's algorithm. The estimate
+                must never be more than the cost of an edge plus the estimate
+                from the node the edge leads to
+
+        Returns:
+            Tuple of the cost and the list of node IDs from start to end node.
+            If no path is found the cost is infinite and the list is empty.
+        """
+        return searches.cheapest_path(start, end, self._weighted_edges(weight), heuristic)
+
+    def k_shortest_paths(
+        self, start: str, end: str, k: int, weight: Union[None, dict, Callable] = None
+    ) -> List[Tuple[float, List[str]]]:
+        """
+        Compute the k lowest cost paths, which don't revisit nodes, from start
+        to end node.
+
+        Parameters:
+            start: string
+                The starting node ID
+            end: string
+                The target node ID
+            k: integer
+                The number of paths to find
+            weight: dictionary or Callable (optional)
+                The cost of each edge, see `cheapest_path`
+
+        Returns:
+            List of up to k tuples of cost and list of node IDs, ordered by cost
+        """
+        return searches.k_shortest_paths(start, end, k, self._weighted_edges(weight))
 
     def get_entry_points(self):
         """
@@ -331,10 +932,7 @@ class Graph(object):
         if len(self._nodes) == 1:
             return list(self._nodes.keys())
 
-        edges = list(self.edges())
-        targets = {target for _, target, _ in edges}
-        sources = {source for source, _, _ in edges}
-        return sorted(sources - targets)
+        return sorted(self._entry_points)
 
     def get_exit_points(self):
         """
@@ -343,10 +941,44 @@ class Graph(object):
         if len(self._nodes) == 1:
             return list(self._nodes.keys())
 
-        edges = list(self.edges())
-        targets = {target for _, target, _ in edges}
-        sources = set(self._edges.keys())
-        return sorted(targets - sources)
+        return sorted(self._exit_points)
+
+    def in_degree(self, nid) -> int:
+        """
+        The number of edges to a given node.
+        """
+        return len(self._inbound.get(nid, ()))
+
+    def out_degree(self, nid) -> int:
+        """
+        The number of edges from a given node.
+        """
+        return len(self._edges.get(nid, ()))
+
+    def degree_histogram(self, direction: str = "out") -> Dict[int, int]:
+        """
+        Count the nodes with each number of edges.
+
+        Parameters:
+            direction: string (optional)
+                "out" to count outgoing edges, "in" to count incoming edges
+
+        Returns:
+            Dictionary of the number of edges to the number of nodes with
+            that many edges
+        """
+        if direction not in ("in", "out"):
+            raise ValueError("direction must be 'in' or 'out'")
+        index = self._inbound if direction == "in" else self._edges
+
+        histogram: Dict[int, int] = {}
+        for records in index.values():
+            histogram[len(records)] = histogram.get(len(records), 0) + 1
+        # nodes without edges in this direction
+        unconnected = sum(1 for nid in self._nodes if nid not in index)
+        if unconnected:
+            histogram[0] = unconnected
+        return dict(sorted(histogram.items()))
 
     def remove_node(self, nid, heal: bool = False):
         """
@@ -357,25 +989,25 @@ class Graph(object):
                 Join the incoming and outgoing connections for the removed node
                 to each other to keep the Graph intact
         """
+        self._unshare()
 
         # remove the node
+        if self._attribute_indexes:
+            self._unindex_node(nid)
         self._nodes.pop(nid, None)
+        self._version += 1
+        # the edges changed when healing are logged as they are changed
+        if self._log is not None:
+            self._log.record("remove_node", nid)
 
         if heal:
             # link the nodes each side of the node being removed
             out_going = self.outgoing_edges(nid)
             in_coming = self.ingoing_edges(nid)
 
-            # remove edges where the node is the source
-            if nid in self._edges:
-                del self._edges[nid]
-
-            # remove the edges where the node is the target
-            for source, records in self._edges.items():
-                self._edges[source] = [
-                    (target, relationship) for target, relationship in records if target != nid
-                ]
-            self._edges = {k: v for k, v in self._edges.items() if len(v) > 0}
+            # remove edges where the node is the source or the target
+            for source, target, relationship in out_going + in_coming:
+                self.remove_edge(source, target, relationship)
 
             # wire up the old incoming and outgoing nodes, cartesian style
             for out_nid in out_going:
@@ -390,60 +1022,240 @@ class Graph(object):
         - target (str): The target node of the edge.
         - relationship (str): The relationship label of the edge.
         """
-        if source not in self._edges:
+        self._unshare()
+        existing_edges = self._private(self._edges, source)
+        if existing_edges is None:
             return
         edge_to_remove = (target, relationship)
-        if source in self._edges and edge_to_remove in self._edges[source]:
-            working_set = list(self._edges[source])
-            working_set.remove(edge_to_remove)
-            self._edges[source] = tuple(working_set)
-            if not self._edges[source]:  # If no edges left for the source
+        if edge_to_remove in existing_edges:
+            del existing_edges[edge_to_remove]
+            if not existing_edges:  # If no edges left for the source
                 del self._edges[source]
+            self._unindex_edge(source, target, relationship)
+            if self._log is not None:
+                self._log.record("remove_edge", source, target, relationship)
 
     def insert_node_before(self, nid, node, before_nid):
         """rewrite the plan putting the new node before a given node"""
-        # add the new node to the plan
-        self.add_node(nid, node)
-        # change all the edges that were going into the old nid to the new one
-
-        for source, records in self._edges.items():
-            new_records = []
-            for target, relationship in records:
-                if target != before_nid:
-                    new_records.append(
-                        (
-                            target,
-                            relationship,
-                        )
-                    )
-                else:
-                    new_records.append(
-                        (
-                            nid,
-                            relationship,
-                        )
-                    )
+        self._unshare()
+        # the insert is logged rather than the changes it makes
+        log, self._log = self._log, None
+        try:
+            # add the new node to the plan
+            self.add_node(nid, node)
+            # change all the edges that were going into the old nid to the new one
+            # - the reverse index tells us which sources to rewrite
+            incoming = list(self._inbound.get(before_nid, ()))
+            for source, relationship in incoming:
+                self._unindex_edge(source, before_nid, relationship)
+            for source in {source for source, _ in incoming}:
+                new_records = {}
+                for target, relationship in self._edges[source]:
+                    if target != before_nid:
+                        new_records[(target, relationship)] = None
+                    else:
+                        new_records[(nid, relationship)] = None
                 self._edges[source] = new_records
-        # add an edge from the new nid to the old one
-        self.add_edge(nid, before_nid)
+            for source, relationship in incoming:
+                self._index_edge(source, nid, relationship)
+            # add an edge from the new nid to the old one
+            self.add_edge(nid, before_nid)
+        finally:
+            self._log = log
+        if log is not None:
+            log.record("insert_node_before", nid, node, before_nid)
 
     def insert_node_after(self, nid, node, after_nid):
         """rewrite the plan putting the new node after a given node"""
-        # add the new node to the plan
-        self.add_node(nid, node)
-        # change all the edges that were coming from the old nid to the new one
-        if after_nid in self._edges:
-            self._edges[nid] = self._edges.pop(after_nid)
-        # add an edge from the new nid to the old one
-        self.add_edge(after_nid, nid)
+        self._unshare()
+        # the insert is logged rather than the changes it makes
+        log, self._log = self._log, None
+        try:
+            # add the new node to the plan
+            self.add_node(nid, node)
+            # change all the edges that were coming from the old nid to the new one
+            if after_nid in self._edges:
+                for target, relationship in self._edges.get(nid, ()):
+                    self._unindex_edge(nid, target, relationship)
+                self._edges[nid] = self._edges.pop(after_nid)
+                for target, relationship in self._edges[nid]:
+                    self._unindex_edge(after_nid, target, relationship)
+                    self._index_edge(nid, target, relationship)
+            # add an edge from the new nid to the old one
+            self.add_edge(after_nid, nid)
+        finally:
+            self._log = log
+        if log is not None:
+            log.record("insert_node_after", nid, node, after_nid)
+
+    def snapshot(self) -> "Graph":
+        """
+        Create a read-only snapshot of the current object.
 
-    def copy(self):  # pragma: nocover
+        The snapshot shares the edges, nodes and indexes of the Graph so is
+        cheap to create, the next change to the Graph copies what it changes
+        rather than changing what is shared. Snapshots can be read from many
+        threads while the Graph is being changed in another.
+
+        Changes made directly to the attributes returned for a node are
+        seen by the snapshot, replace the node's attributes with `add_node`
+        instead.
+
+        Returns:
+            Graph
         """
-        Create a deep copy of the current object.
+        if self._frozen:
+            return self
+        return self._share(frozen=True)
+
+    def _share(self, frozen: bool) -> "Graph":
+        """internal helper method, create a Graph sharing this Graph's structure"""
+        other = Graph.__new__(Graph)
+        for slot in Graph.__slots__:
+            setattr(other, slot, getattr(self, slot))
+        other._query_cache = None
+        other._log = None
+        other._frozen = frozen
+        other._shared = True
+        other._owned = set()
+        # snapshots don't change so don't need to copy what they share
+        if not self._frozen:
+            self._shared = True
+            self._owned = set()
+        return other
+
+    @property
+    def is_snapshot(self) -> bool:
+        return self._frozen
+
+    def copy(self, deep: bool = True, lazy: bool = False) -> "Graph":
+        """
+        Create a copy of the current object, the copy can be changed without
+        changing this Graph. Copies of snapshots are not read-only.
+
+        The edges and indexes are copied container by container, edges are
+        tuples so are not copied.
+
+        Parameters:
+            deep: boolean (optional)
+                Copy the node attributes (the default), if False the copy
+                shares the node attributes with this Graph
+            lazy: boolean (optional)
+                Share the edges and indexes with this Graph, each Graph
+                copies what it changes when it is changed (see `snapshot`)
+
+        Returns:
+            Graph
         """
         import copy
 
-        return copy.deepcopy(self)
+        nodes = self._nodes
+        if deep:
+            if isinstance(nodes, ColumnarAttributes):
+                nodes = nodes.copy(deep=True)
+            else:
+                nodes = copy.deepcopy(nodes)
+
+        if lazy:
+            other = self._share(frozen=False)
+            other._nodes = nodes
+            return other
+
+        other = Graph.__new__(Graph)
+        other._nodes = nodes if deep else nodes.copy()
+        other._edges = {source: dict(records) for source, records in self._edges.items()}
+        other._inbound = {target: dict(records) for target, records in self._inbound.items()}
+        other._relationships = {
+            source: {relationship: dict(targets) for relationship, targets in related.items()}
+            for source, related in self._relationships.items()
+        }
+        other._entry_points = set(self._entry_points)
+        other._exit_points = set(self._exit_points)
+        other._attribute_indexes = {
+            key: {value: dict(nids) for value, nids in index.items()}
+            for key, index in self._attribute_indexes.items()
+        }
+        other._version = self._version
+        other._query_cache = None
+        other._log = None
+        other._compacted = None
+        other._frozen = False
+        other._shared = False
+        other._owned = None
+        return other
+
+    def compact(self):
+        """
+        Create a frozen, memory-optimized CompactGraph of the current object.
+
+        The CompactGraph is kept and returned again until the Graph changes.
+        """
+        from travers.graphs.compact_graph import CompactGraph
+
+        if self._compacted is None or self._compacted[0] != self._version:
+            self._compacted = (self._version, CompactGraph.from_graph(self))
+        return self._compacted[1]
+
+    def to_graphml(self, graphml_file: str):
+        """
+        Write the Graph to a GraphML file.
+
+        The file is written as the nodes and edges are read, an intermediate
+        copy of the Graph is not created. Attribute values are written as
+        strings.
+
+        Parameters:
+            graphml_file: string
+                The GraphML file to write
+        """
+        from xml.sax.saxutils import escape
+        from xml.sax.saxutils import quoteattr
+
+        # keys must be declared before they are used, so find them first
+        keys: dict = {}
+        for _, attributes in self.nodes(data=True):
+            if isinstance(attributes, dict):
+                for name in attributes:
+                    if name not in keys:
+                        keys[name] = f"d{len(keys)}"
+        relationship_key = f"d{len(keys)}"
+
+        with open(graphml_file, "w", encoding="utf-8") as fd:
+            fd.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            fd.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            for name, key in keys.items():
+                fd.write(
+                    f'  <key id="{key}" for="node" attr.name={quoteattr(str(name))} '
+                    'attr.type="string" />\n'
+                )
+            fd.write(
+                f'  <key id="{relationship_key}" for="edge" attr.name="relationship" '
+                'attr.type="string" />\n'
+            )
+            fd.write('  <graph edgedefault="directed">\n')
+
+            for nid, attributes in self.nodes(data=True):
+                if not isinstance(attributes, dict) or not attributes:
+                    fd.write(f"    <node id={quoteattr(str(nid))} />\n")
+                    continue
+                fd.write(f"    <node id={quoteattr(str(nid))}>\n")
+                for name, value in attributes.items():
+                    fd.write(f'      <data key="{keys[name]}">{escape(str(value))}</data>\n')
+                fd.write("    </node>\n")
+
+            for source, target, relationship in self.edges():
+                edge = f"    <edge source={quoteattr(str(source))} target={quoteattr(str(target))}"
+                if relationship is None:
+                    fd.write(edge + " />\n")
+                    continue
+                fd.write(edge + ">\n")
+                fd.write(
+                    f'      <data key="{relationship_key}">{escape(str(relationship))}</data>\n'
+                )
+                fd.write("    </edge>\n")
+
+            fd.write("  </graph>\n")
+            fd.write("</graphml>\n")
 
     def to_networkx(self):  # pragma: nocover
         """
@@ -489,13 +1301,60 @@ class Graph(object):
     def __setitem__(self, nid, node):
         if not nid in self._nodes:
             raise ValueError("Cannot create nodes with [] syntax")
-        self._nodes[nid] = node
+        self.add_node(nid, node)
 
     def __add__(self, other):
-        self._edges.update(other._edges)
-        self._nodes.update(other._nodes)
+        self._unshare()
+        # sources in the other graph replace the same sources in this graph
+        replaced = {source: self._edges.get(source, {}) for source in other._edges}
+        self._edges.update({source: dict(records) for source, records in other._edges.items()})
+        for source, records in other._edges.items():
+            for target, relationship in replaced[source]:
+                self._unindex_edge(source, target, relationship)
+                if self._log is not None:
+                    self._log.record("remove_edge", source, target, relationship)
+            for target, relationship in records:
+                self._index_edge(source, target, relationship)
+                if self._log is not None:
+                    self._log.record("add_edge", source, target, relationship)
+        if self._attribute_indexes or self._log is not None:
+            for nid, node in other._nodes.items():
+                self.add_node(nid, node)
+        else:
+            self._nodes.update(other._nodes)
+            self._version += 1
         return self
 
     def draw(self):
-        tree = self.depth_first_search()
-        return "".join(print_tree_inner(tree))
+        return "".join(self.draw_lines())
+
+    def draw_lines(self):
+        """
+        Draw the graph as an ascii tree, one line at a time.
+
+        Whether a node is the last child of its parent is only known once the
+        walk has moved past it, so the walk is held as a flat list of
+        (node, depth) pairs rather than a nested tree.
+        """
+        events = [(nid, depth) for nid, depth, _ in self.depth_first_events()]
+
+        # work backwards, a node is the last child of its parent if no node
+        # at the same depth follows it before a shallower node does
+        lasts = []
+        following: list = []
+        for _, depth in reversed(events):
+            if len(following) > depth:
+                lasts.append(not following[depth])
+                del following[depth + 1 :]
+            else:
+                lasts.append(True)
+                following.extend([False] * (depth + 1 - len(following)))
+            following[depth] = True
+        lasts.reverse()
+
+        prefixes = [""]
+        for (nid, depth), last in zip(events, lasts):
+            prefix = prefixes[depth]
+            del prefixes[depth + 1 :]
+            prefixes.append(prefix + ("   " if last else "│  "))
+            yield prefix + ("└─ " if last else "├─ ") + str(self[nid]) + "\n"
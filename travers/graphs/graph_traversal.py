@@ -16,6 +16,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 from typing import Callable
+from typing import Optional
+
+
+def _is_hashable(value) -> bool:
+    """internal helper method, can the value be looked up in an index"""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
 
 
 class GraphTraversal:
@@ -56,12 +66,108 @@ class GraphTraversal:
         """
         active_nodes = []
 
-        for node in self._active_nodes:
-            active_nodes += [
-                t for (s, t, r) in self.graph.outgoing_edges(node) if r in relationships
-            ]
+        if relationships:
+            for node in self._active_nodes:
+                active_nodes += [t for (s, t, r) in self.graph.outgoing_edges(node, *relationships)]
+        return GraphTraversal(graph=self.graph, active_nodes=active_nodes)
+
+    def follow_in(self, *relationships):
+        """
+        Traverses a graph by following edges backwards, to the active nodes
+        from nodes with a relationship on the list of relationships.
+
+        Parameters:
+            relationsips: strings
+                traverses node following edges with the stated relationship
+
+        Returns:
+            GraphTraversal
+        """
+        active_nodes = []
+
+        if relationships:
+            for node in self._active_nodes:
+                active_nodes += [s for (s, t, r) in self.graph.ingoing_edges(node, *relationships)]
+        return GraphTraversal(graph=self.graph, active_nodes=active_nodes)
+
+    def both(self, *relationships):
+        """
+        Traverses a graph by following edges in both directions from the
+        active nodes with a relationship on the list of relationships.
+
+        Parameters:
+            relationsips: strings
+                traverses node following edges with the stated relationship
+
+        Returns:
+            GraphTraversal
+        """
+        active_nodes = self.follow(*relationships)._active_nodes
+        active_nodes.update(self.follow_in(*relationships)._active_nodes)
         return GraphTraversal(graph=self.graph, active_nodes=active_nodes)
 
+    def repeat(
+        self,
+        relationships,
+        times: Optional[int] = None,
+        until: Optional[Callable] = None,
+        emit: bool = True,
+    ):
+        """
+        Traverses a graph by repeatedly following edges from the active nodes
+        with a relationship on the list of relationships.
+
+        Each node is expanded at most once, so following a relationship
+        transitively visits each reachable edge once, even on cyclic graphs.
+
+        Parameters:
+            relationships: string or list of strings
+                traverses node following edges with the stated relationship
+            times: integer (optional)
+                the maximum number of edges to follow, if not provided the
+                edges are followed until no new nodes are reached
+            until: Callable (optional)
+                called with the attributes of each node reached, the edges
+                from nodes where this is True are not followed
+            emit: boolean (optional)
+                if True (the default) every node reached is active, if False
+                only the nodes where the repetition stopped are active; those
+                matching `until` and those reached by the last of `times` hops
+
+        Returns:
+            GraphTraversal
+        """
+        if isinstance(relationships, str):
+            relationships = (relationships,)
+        graph = self.graph
+
+        expanded = set(self._active_nodes)
+        frontier = list(self._active_nodes)
+        reached: set = set()
+        stopped: set = set()
+        hops = 0
+
+        while frontier and relationships and (times is None or hops < times):
+            hops += 1
+            next_frontier = []
+            for node in frontier:
+                for _, target, _ in graph.outgoing_edges(node, *relationships):
+                    if target in reached:
+                        continue
+                    reached.add(target)
+                    if until is not None and until(graph[target]):
+                        stopped.add(target)
+                    elif target not in expanded:
+                        expanded.add(target)
+                        next_frontier.append(target)
+            frontier = next_frontier
+
+        if emit:
+            return GraphTraversal(graph=self.graph, active_nodes=reached)
+        if times is not None and hops == times:
+            stopped.update(frontier)
+        return GraphTraversal(graph=self.graph, active_nodes=stopped)
+
     def select(self, filter: Callable):
         """
         Filters the active nodes by a function.
@@ -78,8 +184,20 @@ class GraphTraversal:
 
     def has(self, key, value):
         """
-        Filters the active nodes by a key/value match
+        Filters the active nodes by a key/value match, if the attribute is
+        indexed the index is used rather than reading every active node
         """
+        index = self.graph.attribute_index(key)
+        # nodes without the attribute match None but aren't in the index, and
+        # values which can't be hashed can't be looked up, so read the nodes
+        if index is not None and value is not None and _is_hashable(value):
+            matches = index.get(value, {})
+            if len(matches) < len(self._active_nodes):
+                active_nodes = {nid for nid in matches if nid in self._active_nodes}
+            else:
+                active_nodes = {nid for nid in self._active_nodes if nid in matches}
+            return GraphTraversal(graph=self.graph, active_nodes=active_nodes)
+
         active_nodes = [
             nid for nid, attrib in self.active_nodes(data=True) if attrib.get(key) == value
         ]
@@ -96,10 +214,10 @@ class GraphTraversal:
         return self._active_nodes_cache
 
     def list_relationships(self):
-        relationships = []
+        relationships = set()
         for node in self._active_nodes:
-            relationships += {r for (s, t, r) in self.graph.outgoing_edges(node)}
-        return set(relationships)
+            relationships.update(self.graph.outgoing_relationships(node))
+        return relationships
 
     def __repr__(self):  # pragma: no-cover
         return f"Graph - {len(list(self.graph.nodes()))} nodes ({len(self._active_nodes)} selected), {len(list(self.graph.edges()))} edges"
@@ -15,27 +15,55 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import gc
 import types
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable
+from typing import Optional
 
 import orjson
 
 from travers import xmler
+from travers.graphs.batch_traversal import BatchTraversal
+from travers.graphs.binary_format import BINARY_FILE
+from travers.graphs.binary_format import read_binary
+from travers.graphs.compact_graph import CompactGraph
+from travers.graphs.graph import MANIFEST_FILE
 from travers.graphs.graph import Graph
+from travers.graphs.graph import index_adjacency
 from travers.graphs.graph_traversal import GraphTraversal
+from travers.graphs.lazy_traversal import LazyTraversal
+from travers.graphs.mutation_log import LOG_FILE
+from travers.graphs.mutation_log import is_open
+from travers.graphs.mutation_log import read_log
 
+CHUNK_SIZE = 16 * 1024 * 1024
 
-def walk(graph, nids=None):
+
+def walk(graph, nids=None, vectorised: bool = False, lazy: bool = False):
     """
     Begin a traversal by selecting the matching nodes.
 
     Parameters:
         *nids: strings
             the identity(s) of the node(s) to select
+        vectorised: boolean (optional)
+            traverse a CompactGraph of the graph using NumPy, this is much
+            faster for traversals with many active nodes; the CompactGraph
+            is built by the first vectorised walk and reused until the graph
+            changes
+        lazy: boolean (optional)
+            record the traversal steps and run them together when the
+            results are needed
 
     Returns:
         A Graph instance
     """
+    if vectorised:
+        return _walk_vectorised(graph, nids)
+    if lazy:
+        return LazyTraversal(graph, set(_make_a_list(nids or [])))
     if nids:
         nids = _make_a_list(nids)
         if len(nids) > 0:
@@ -44,10 +72,67 @@ def walk(graph, nids=None):
         return GraphTraversal(graph, set())
 
 
+def walk_where(graph, key, value):
+    """
+    Begin a traversal by selecting the nodes with a given attribute value,
+    the attribute's index is used if it has one.
+
+    Parameters:
+        key: string
+            the attribute to match
+        value: any
+            the value to match
+
+    Returns:
+        GraphTraversal
+    """
+    return GraphTraversal(graph=graph, active_nodes=set(graph.find_nodes(key, value)))
+
+
+def walk_many(graph, queries):
+    """
+    Begin a traversal for many queries at once, each step is run for all of
+    the queries together.
+
+    Parameters:
+        queries: list
+            the node(s) to select for each query
+
+    Returns:
+        BatchTraversal
+    """
+    return BatchTraversal(graph, [set(_make_a_list(nids or [])) for nids in queries])
+
+
+def _walk_vectorised(graph, nids=None):
+    """begin a vectorised traversal, graphs are compacted if they need to be, the
+    compacted graph is reused until the graph changes"""
+    from travers.graphs.vector_traversal import VectorTraversal
+
+    if not isinstance(graph, CompactGraph):
+        graph = graph.compact()
+    nid_index = graph._nid_index
+    active = [nid_index.get(nid) for nid in _make_a_list(nids or [])]
+    active = [index for index in active if index is not None]
+    return VectorTraversal.from_indexes(graph.vector_engine(), active)
+
+
+def _graphml_data(element, keys):
+    """read the data of a GraphML node or edge, unknown keys raise a KeyError"""
+    return {
+        keys[datum.get("key")]: (datum.text or "").strip()
+        for datum in element
+        if xmler._local_name(datum.tag) == "data"
+    }
+
+
 def read_graphml(graphml_file: str):
     """
     Load a GraphML file into a Graph
 
+    The file is streamed, keys, nodes and edges are added to the Graph as
+    they are read so the whole document is never held in memory.
+
     Parameters:
         graphml_file: string
             The GraphML file to load
@@ -55,101 +140,229 @@ def read_graphml(graphml_file: str):
     Returns:
         Graph
     """
-    with open(graphml_file, "r") as fd:
-        xml_dom = xmler.parse(fd.read())
-
     g = Graph()
-
-    # load the keys
     keys = {}
-    for key in xml_dom["graphml"].get("key", {}):
-        keys[key["@id"]] = key["@attr.name"]
-
-    g._nodes = {}
-    # load the nodes
-    for node in xml_dom["graphml"]["graph"].get("node", {}):
-        data = {}
-        skip = False
-        for key in g._make_a_list(node.get("data", {})):
+
+    for tag, element in xmler.iterparse(graphml_file, {"key", "node", "edge"}):
+        if tag == "key":
+            keys[element.get("id")] = element.get("attr.name")
+        elif tag == "node":
             try:
-                data[keys[key["@key"]]] = key.get("#text", "")
-            except:
-                skip = True
-        if not skip:
-            g.add_node(node["@id"], data)
-
-    g._edges = {}
-    for edge in xml_dom["graphml"]["graph"].get("edge", {}):
-        data = {}
-        source = edge["@source"]
-        target = edge["@target"]
-        for key in g._make_a_list(edge.get("data", {})):
-            data[keys[key["@key"]]] = key["#text"]
-        if source not in g._edges:
-            g._edges[source] = []
-        g.add_edge(source, target, data.get("relationship"))  # type:ignore
+                g.add_node(element.get("id"), _graphml_data(element, keys))
+            except KeyError:
+                pass
+        else:
+            data = _graphml_data(element, keys)
+            g.add_edge(element.get("source"), element.get("target"), data.get("relationship"))
 
     return g
 
 
-def _load_node_file(path: Path):
-    """load the node information from a file"""
-    nodes = []
-    with open(path, "r") as node_file:
-        for line in node_file:
-            node = orjson.loads(line)
-            nodes.append(
-                (
-                    node["nid"],
-                    node["attributes"],
-                )
-            )
-    results = {n: a for n, a in nodes}
-    return results
-
-
-def _load_edge_file(path: Path):
-    """load the edge information from a file"""
-    edges = []
-    with open(path, "r") as edge_file:
-        for line in edge_file:
-            node = orjson.loads(line)
-            edges.append(
-                (
-                    node["source"],
-                    node["target"],
-                    node["relationship"],
-                )
-            )
-    results: dict = {s: [] for s, t, r in edges}
-    for s, t, r in edges:
-        results[s].append(
-            (
-                t,
-                r,
-            )
-        )
-    return results
-
-
-def load(path: str):
+@contextmanager
+def _collection_paused():
+    """
+    Pause garbage collection, loading creates millions of containers none of
+    which are garbage, but they trigger repeated collections which each scan
+    everything loaded so far.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _read_records(path: Path, progress: Optional[Callable] = None):
+    """
+    Stream the records from a JSONL file, the file is read in large binary
+    chunks and each complete line is decoded as it is found.
+    """
+    chunk_size = CHUNK_SIZE
+    total = path.stat().st_size
+    read = 0
+    remainder = b""
+    with open(path, "rb") as records_file:
+        while True:
+            chunk = records_file.read(chunk_size)
+            if not chunk:
+                break
+            read += len(chunk)
+            lines = (remainder + chunk).split(b"\n")
+            # the last line may be incomplete, keep it for the next chunk
+            remainder = lines.pop()
+            for line in lines:
+                if line:
+                    yield orjson.loads(line)
+            if progress is not None:
+                progress(path.name, read, total)
+    if remainder.strip():
+        yield orjson.loads(remainder)
+
+
+def _load_node_file(graph: Graph, path: Path, progress: Optional[Callable] = None):
+    """load the node information from a file into the graph"""
+    nodes = graph._nodes
+    for node in _read_records(path, progress):
+        nodes[node["nid"]] = node["attributes"]
+
+
+def _read_edges(edges: dict, path: Path, progress: Optional[Callable] = None):
+    """
+    read the edges in a file into adjacency lists, edges with an undefined
+    node are skipped as `Graph.add_edge` would skip them
+    """
+    for edge in _read_records(path, progress):
+        source = edge["source"]
+        target = edge["target"]
+        if source is None or target is None:
+            continue
+        records = edges.get(source)
+        if records is None:
+            records = edges[source] = {}
+        records[(target, edge["relationship"])] = None
+
+
+def _load_edge_file(graph: Graph, path: Path, progress: Optional[Callable] = None):
+    """load the edge information from a file into the graph"""
+    # build the adjacency lists directly and index them in one pass at the end,
+    # rather than updating the indexes as each edge is added
+    _read_edges(graph._edges, path, progress)
+    graph._build_indexes()
+
+
+def _parse_node_shard(path: Path) -> dict:
+    """parse a node part file, this is run in a worker process"""
+    with _collection_paused():
+        return {node["nid"]: node["attributes"] for node in _read_records(path)}
+
+
+def _parse_edge_shard(path: Path) -> tuple:
+    """
+    parse an edge part file into adjacency lists and their reverse and
+    relationship indexes, this is run in a worker process
+    """
+    with _collection_paused():
+        edges: dict = {}
+        _read_edges(edges, path)
+        return (edges, *index_adjacency(edges))
+
+
+def _load_sharded(
+    graph_path: Path, workers: Optional[int] = None, progress: Optional[Callable] = None
+):
+    """load a graph saved as part files, parsing the parts in a process pool"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(graph_path / MANIFEST_FILE, "rb") as manifest_file:
+        manifest = orjson.loads(manifest_file.read())
+
+    g = Graph()
+    edges = g._edges
+    inbound: dict = {}
+    relationships: dict = {}
+    with _collection_paused(), ProcessPoolExecutor(max_workers=workers) as pool:
+        node_parts = [pool.submit(_parse_node_shard, graph_path / n) for n in manifest["nodes"]]
+        edge_parts = [pool.submit(_parse_edge_shard, graph_path / n) for n in manifest["edges"]]
+
+        for i, (name, part) in enumerate(zip(manifest["nodes"], node_parts)):
+            g._nodes.update(part.result())
+            if progress is not None:
+                progress(name, i + 1, len(node_parts))
+        for i, (name, part) in enumerate(zip(manifest["edges"], edge_parts)):
+            part_edges, part_inbound, part_relationships = part.result()
+            # parts are split by source, merge in case a source is in more than one
+            for source in part_edges.keys() & edges.keys():
+                edges[source].update(part_edges.pop(source))
+                related = relationships[source]
+                for relationship, targets in part_relationships.pop(source).items():
+                    related.setdefault(relationship, {}).update(targets)
+            edges.update(part_edges)
+            relationships.update(part_relationships)
+            # targets have incoming edges from sources in many parts
+            for target in part_inbound.keys() & inbound.keys():
+                records = inbound[target]
+                records.update(part_inbound[target])
+                part_inbound[target] = records
+            inbound.update(part_inbound)
+            if progress is not None:
+                progress(name, i + 1, len(edge_parts))
+
+        g._set_indexes(inbound, relationships)
+    return g
+
+
+def load(path: str, progress: Optional[Callable] = None, workers: Optional[int] = None):
     """
     Load a saved Graph.
 
+    Graphs saved in the binary format (see `CompactGraph.save`) are memory
+    mapped and returned as a CompactGraph. Graphs saved as part files (see
+    `Graph.save`) are parsed in a process pool. Changes in the folder's
+    mutation log (see `Graph.attach_log`) are replayed over the saved Graph.
+
     Parameters:
         path: string
             The path to the folder containing the Graph files
+        progress: Callable (optional)
+            Called after each chunk is read with the name of the file being
+            read, the bytes read so far and the size of the file; for graphs
+            saved as part files it is called after each part is merged with
+            the name of the part, the parts merged so far and the number of
+            parts
+        workers: integer (optional)
+            The number of processes used to load graphs saved as part files,
+            defaults to the number of processors
 
     Returns:
-        Graph
+        Graph or CompactGraph
     """
-    g = Graph()
     graph_path = Path(path)
-    g._nodes = _load_node_file(graph_path / "nodes.jsonl")
-    g._edges = _load_edge_file(graph_path / "edges.jsonl")
+    if (graph_path / BINARY_FILE).exists():
+        return read_binary(graph_path)
+    if (graph_path / MANIFEST_FILE).exists():
+        g = _load_sharded(graph_path, workers, progress)
+    else:
+        g = Graph()
+        with _collection_paused():
+            _load_node_file(g, graph_path / "nodes.jsonl", progress)
+            _load_edge_file(g, graph_path / "edges.jsonl", progress)
+
+    if (graph_path / LOG_FILE).exists():
+        _replay_log(g, graph_path / LOG_FILE)
     return g
 
 
+def _replay_log(graph: Graph, path: Path):
+    """internal helper method, apply the changes in a mutation log to a graph"""
+    for operation, arguments in read_log(path):
+        getattr(graph, operation)(*arguments)
+
+
+def compact_log(path: str):
+    """
+    Save a Graph with the changes in its mutation log, and remove the log.
+
+    Graphs writing to the log must call `Graph.detach_log` first, otherwise
+    their later changes would be written to the removed log.
+
+    Parameters:
+        path: string
+            The path to the folder containing the Graph files
+    """
+    graph_path = Path(path)
+    if (graph_path / BINARY_FILE).exists():
+        raise ValueError(f"'{path}' is a binary graph, binary graphs do not have mutation logs")
+    if is_open(graph_path / LOG_FILE):
+        raise ValueError(f"the mutation log in '{path}' is attached to a Graph, detach it first")
+    shards = 1
+    if (graph_path / MANIFEST_FILE).exists():
+        with open(graph_path / MANIFEST_FILE, "rb") as manifest_file:
+            shards = orjson.loads(manifest_file.read())["shards"]
+    load(graph_path).save(graph_path, shards=shards)
+
+
 def _make_a_list(obj):
     """internal helper method"""
     if isinstance(obj, (set, list, types.GeneratorType)):
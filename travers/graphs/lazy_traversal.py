@@ -0,0 +1,179 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from travers.graphs.graph_traversal import GraphTraversal
+
+
+class LazyTraversal:
+    """
+    Graph Traversal which records its steps and only runs them when the
+    results are asked for.
+
+    When run, the steps are planned as stages: each `follow` starts a stage
+    and the `has` and `select` filters after it are pushed into that stage,
+    so each node is filtered as it is reached rather than building a new set
+    of active nodes for every step.
+
+    If the graph has a query cache (see `Graph.enable_query_cache`) results
+    are cached by the starting nodes and the recorded steps.
+    """
+
+    __slots__ = ("graph", "_start", "_steps", "_result")
+
+    def __init__(self, graph, start: set, steps: Tuple = ()):
+        """
+        Lazy Graph Traversal
+
+        Parameters:
+            graph: Graph
+            start: set
+                The nodes the traversal starts from
+            steps: tuple
+                The recorded steps
+        """
+        self.graph = graph
+        self._start = start
+        self._steps = steps
+        self._result = None
+
+    def _add_step(self, *step):
+        return LazyTraversal(self.graph, self._start, self._steps + (step,))
+
+    def follow(self, *relationships):
+        """
+        Record a step following edges from the active nodes with a
+        relationship on the list of relationships.
+
+        Returns:
+            LazyTraversal
+        """
+        return self._add_step("follow", relationships)
+
+    def select(self, filter: Callable):
+        """
+        Record a step filtering the active nodes by a function.
+
+        Returns:
+            LazyTraversal
+        """
+        return self._add_step("select", filter)
+
+    def has(self, key, value):
+        """
+        Record a step filtering the active nodes by a key/value match.
+
+        Returns:
+            LazyTraversal
+        """
+        return self._add_step("has", (key, value))
+
+    def plan(self) -> List[Tuple]:
+        """
+        Group the recorded steps into stages.
+
+        Returns:
+            List of Tuples of the relationships to follow (None for the
+            starting nodes) and the filters to apply to the nodes reached
+        """
+        stages: list = [(None, [])]
+        for step, argument in self._steps:
+            if step == "follow":
+                stages.append((argument, []))
+            elif step == "has":
+                key, value = argument
+                stages[-1][1].append(lambda attrib, k=key, v=value: attrib.get(k) == v)
+            else:
+                stages[-1][1].append(argument)
+        return stages
+
+    def _run(self) -> frozenset:
+        """internal helper method, run the plan or get the result from the cache"""
+        cache = self.graph.query_cache
+        if cache is None:
+            return self._execute()
+        try:
+            key = (frozenset(self._start), self._steps)
+            hash(key)
+        except TypeError:  # steps with values which can't be hashed aren't cached
+            return self._execute()
+        version = self.graph.version
+        result = cache.get(key, version)
+        if result is None:
+            result = self._execute()
+            cache.put(key, version, result)
+        return result
+
+    def _execute(self) -> frozenset:
+        """internal helper method, run the plan"""
+        graph = self.graph
+
+        def accept(nid, filters):
+            attrib = graph[nid]
+            return all(f(attrib) for f in filters)
+
+        active = self._start
+        for relationships, filters in self.plan():
+            if relationships is None:
+                if filters:
+                    active = {nid for nid in active if accept(nid, filters)}
+                continue
+
+            reached: set = set()
+            rejected: set = set()
+            if relationships:
+                for node in active:
+                    for _, target, _ in graph.outgoing_edges(node, *relationships):
+                        if target in reached or target in rejected:
+                            continue
+                        if not filters or accept(target, filters):
+                            reached.add(target)
+                        else:
+                            rejected.add(target)
+            active = reached
+        return frozenset(active)
+
+    def active_nodes(self, data=False):
+        if self._result is None:
+            self._result = self._run()
+        if not data:
+            return self._result
+        return [(nid, self.graph[nid]) for nid in self._result]
+
+    def values(self, key):
+        return list({attrib[key] for nid, attrib in self.active_nodes(data=True) if key in attrib})
+
+    def list_relationships(self):
+        relationships = set()
+        for node in self.active_nodes():
+            relationships.update(self.graph.outgoing_relationships(node))
+        return relationships
+
+    def collect(self) -> GraphTraversal:
+        """
+        Run the recorded steps and continue with an eager traversal.
+        """
+        return GraphTraversal(graph=self.graph, active_nodes=self.active_nodes())
+
+    def __repr__(self):  # pragma: no-cover
+        return f"LazyTraversal - {len(self._steps)} steps from {len(self._start)} nodes"
+
+    def __len__(self):  # pragma: no-cover
+        return len(self.active_nodes())
@@ -0,0 +1,149 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Append-only log of the changes made to a Graph since it was last saved.
+
+Each change is written as a line of JSON, a list of the name of the Graph
+method which made the change followed by its arguments, for example:
+
+    ["add_edge", "Lainie", "Toodyay", "Lives In"]
+
+`load` replays the log over the saved Graph and `Graph.save` empties it.
+"""
+import os
+from pathlib import Path
+
+import orjson
+
+LOG_FILE = "mutations.jsonl"
+LOGGED_OPERATIONS = (
+    "add_node",
+    "add_edge",
+    "remove_node",
+    "remove_edge",
+    "insert_node_before",
+    "insert_node_after",
+)
+
+# the logs open for writing in this process
+_open_logs: set = set()
+
+
+def _trim_partial_record(path: Path):
+    """internal helper method, remove a change which was only partly written"""
+    with open(path, "r+b") as log_file:
+        end = log_file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 65536)
+            log_file.seek(start)
+            chunk = log_file.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            log_file.truncate(position)
+
+
+class MutationLog:
+    """
+    Writer for the mutation log of a Graph.
+    """
+
+    __slots__ = ("path", "sync", "_file")
+
+    def __init__(self, path: Path, sync: bool = False):
+        """
+        Mutation Log
+
+        Parameters:
+            path: Path
+                The log file, changes are appended to it
+            sync: boolean (optional)
+                Wait for each change to be written to disk, rather than just
+                handed to the operating system
+        """
+        # resolved, so the log is recognised however its folder is named later
+        self.path = path.resolve()
+        self.sync = sync
+        # changes are appended, so a partly written change must be removed first
+        if self.path.exists():
+            _trim_partial_record(self.path)
+        self._file = open(self.path, "ab")
+        _open_logs.add(self.path)
+
+    def record(self, operation: str, *arguments):
+        """
+        Append a change to the log.
+
+        Parameters:
+            operation: string
+                The name of the Graph method which made the change
+            arguments: any
+                The arguments of the method
+        """
+        self._file.write(orjson.dumps([operation, *arguments]) + b"\n")
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def truncate(self):
+        """
+        Empty the log, the changes it held have been saved.
+        """
+        self._file.seek(0)
+        self._file.truncate()
+
+    def close(self):
+        self._file.close()
+        _open_logs.discard(self.path)
+
+    def __repr__(self):  # pragma: no-cover
+        return f"MutationLog - {self.path}"
+
+
+def is_open(path: Path) -> bool:
+    """
+    Is a Graph in this process writing to the log.
+    """
+    return path.resolve() in _open_logs
+
+
+def read_log(path: Path):
+    """
+    Read the changes from a mutation log.
+
+    A change which was only partly written, because the process writing it
+    stopped, is ignored.
+
+    Parameters:
+        path: Path
+            The log file
+
+    Returns:
+        Generator of Tuples of (operation, arguments)
+    """
+    with open(path, "rb") as log_file:
+        for line in log_file:
+            if not line.endswith(b"\n"):
+                return
+            operation, *arguments = orjson.loads(line)
+            if operation not in LOGGED_OPERATIONS:
+                raise ValueError(f"'{operation}' is not a logged operation")
+            yield operation, arguments
@@ -0,0 +1,96 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Least recently used cache of traversal results.
+
+    Results are keyed by the starting nodes and the steps of the traversal.
+    The cache holds the version of the graph its results were found against,
+    when the graph has changed every result is discarded.
+    """
+
+    __slots__ = ("maxsize", "hits", "misses", "_version", "_entries")
+
+    def __init__(self, maxsize: int = 128):
+        """
+        Query Cache
+
+        Parameters:
+            maxsize: integer
+                The number of results to hold
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key, version):
+        """
+        Get a result, None is returned if the result isn't held or the graph
+        has changed since it was found.
+
+        Parameters:
+            key: hashable
+                The query
+            version: integer
+                The current version of the graph
+        """
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, version, result):
+        """
+        Hold a result, evicting the least recently used result if the cache
+        is full.
+
+        Parameters:
+            key: hashable
+                The query
+            version: integer
+                The version of the graph the result was found against
+            result: any
+                The result
+        """
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):  # pragma: no-cover
+        return f"QueryCache - {len(self)} of {self.maxsize} results, {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,325 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Search algorithms shared by the Graph implementations.
+
+The searches are written against functions which return the neighbours of a
+node, so the same code can walk the dictionaries of a Graph or the interned
+arrays of a CompactGraph.
+"""
+
+from collections import deque
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+from typing import Callable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from travers.errors import CyclicGraphError
+
+INFINITY = float("inf")
+_ROOT = object()
+
+
+def _trace_path(parents: dict, node) -> list:
+    """internal helper method, follow parent pointers back to the root"""
+    path = []
+    while node is not _ROOT:
+        path.append(node)
+        node = parents[node]
+    return path
+
+
+def shortest_path(start, end, successors: Callable) -> List:
+    """
+    Breadth-first search for the shortest path from start to end.
+
+    Each discovered node records the node it was reached from, the path is
+    rebuilt from these parent pointers once the end is found rather than
+    copying the path to every node in the queue.
+
+    Parameters:
+        start: node
+            The starting node
+        end: node
+            The target node
+        successors: Callable
+            Returns the nodes reachable by an edge from a given node
+
+    Returns:
+        List of nodes from start to end, empty if there is no path
+    """
+    if start == end:
+        return [start]
+
+    parents = {start: _ROOT}
+    queue = deque([start])
+
+    while queue:
+        node = queue.popleft()
+        for neighbour in successors(node):
+            if neighbour not in parents:
+                parents[neighbour] = node
+                if neighbour == end:
+                    return _trace_path(parents, neighbour)[::-1]
+                queue.append(neighbour)
+
+    return []  # No path found
+
+
+def bidirectional_shortest_path(start, end, successors: Callable, predecessors: Callable) -> List:
+    """
+    Breadth-first search for the shortest path from start to end, searching
+    forwards from the start and backwards from the end.
+
+    The smaller of the two frontiers is expanded a level at a time, the
+    search stops when a node is discovered which has been reached from the
+    other side. This explores far fewer nodes than a one-sided search on
+    large, sparse graphs.
+
+    Parameters:
+        start: node
+            The starting node
+        end: node
+            The target node
+        successors: Callable
+            Returns the nodes reachable by an edge from a given node
+        predecessors: Callable
+            Returns the nodes with an edge to a given node
+
+    Returns:
+        List of nodes from start to end, empty if there is no path
+    """
+    if start == end:
+        return [start]
+
+    # forward parents point towards the start, backward parents towards the end
+    forward = {start: _ROOT}
+    backward = {end: _ROOT}
+    forward_frontier = [start]
+    backward_frontier = [end]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            visited, other, frontier, neighbours = forward, backward, forward_frontier, successors
+        else:
+            visited, other, frontier, neighbours = (
+                backward,
+                forward,
+                backward_frontier,
+                predecessors,
+            )
+
+        next_frontier = []
+        for node in frontier:
+            for neighbour in neighbours(node):
+                if neighbour not in visited:
+                    visited[neighbour] = node
+                    if neighbour in other:
+                        path = _trace_path(forward, neighbour)[::-1]
+                        return path + _trace_path(backward, neighbour)[1:]
+                    next_frontier.append(neighbour)
+
+        if visited is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return []  # No path found
+
+
+def cheapest_path(start, end, edges: Callable, heuristic: Optional[Callable] = None) -> Tuple:
+    """
+    Find the lowest cost path from start to end.
+
+    This is Dijkstra's algorithm, or A* when a heuristic is provided, using a
+    binary heap as the priority queue. The search stops as soon as the end
+    node is taken from the queue.
+
+    Parameters:
+        start: node
+            The starting node
+        end: node
+            The target node
+        edges: Callable
+            Returns tuples of (neighbour, cost) for the edges from a given node,
+            costs must not be negative
+        heuristic: Callable (optional)
+            Estimates the cost from a given node to the end, to find the lowest
+            cost path the estimate must never be more than the cost of an edge
+            plus the estimate from the node the edge leads to
+
+    Returns:
+        Tuple of the cost and the list of nodes from start to end, if there is
+        no path the cost is infinite and the list is empty
+    """
+    if start == end:
+        return 0, [start]
+
+    parents = {start: _ROOT}
+    costs = {start: 0}
+    done = set()
+    counter = count()  # breaks ties without comparing nodes
+    queue = [(heuristic(start) if heuristic else 0, next(counter), start)]
+
+    while queue:
+        _, _, node = heappop(queue)
+        if node in done:
+            continue
+        if node == end:
+            return costs[node], _trace_path(parents, node)[::-1]
+        done.add(node)
+
+        for neighbour, cost in edges(node):
+            if cost < 0:
+                raise ValueError("Edge costs must not be negative")
+            if neighbour in done:
+                continue
+            candidate = costs[node] + cost
+            if candidate < costs.get(neighbour, INFINITY):
+                costs[neighbour] = candidate
+                parents[neighbour] = node
+                priority = candidate + heuristic(neighbour) if heuristic else candidate
+                heappush(queue, (priority, next(counter), neighbour))
+
+    return INFINITY, []  # No path found
+
+
+def k_shortest_paths(start, end, k: int, edges: Callable) -> List[Tuple]:
+    """
+    Find the k lowest cost paths, which do not revisit nodes, from start to end.
+
+    This is Yen's algorithm, each path after the first is found by deviating
+    from a previously found path at each of its nodes in turn.
+
+    Parameters:
+        start: node
+            The starting node
+        end: node
+            The target node
+        k: integer
+            The number of paths to find
+        edges: Callable
+            Returns tuples of (neighbour, cost) for the edges from a given node,
+            costs must not be negative
+
+    Returns:
+        List of up to k tuples of cost and the list of nodes from start to
+        end, ordered by cost
+    """
+    if k < 1:
+        return []
+
+    cost, path = cheapest_path(start, end, edges)
+    if not path:
+        return []
+
+    def edge_cost(source, target):
+        return min(cost for neighbour, cost in edges(source) if neighbour == target)
+
+    found = [(cost, path)]
+    seen = {tuple(path)}
+    candidates: list = []
+    counter = count()
+
+    while len(found) < k:
+        _, previous = found[-1]
+        root_cost = 0
+        for i in range(len(previous) - 1):
+            spur, root = previous[i], previous[: i + 1]
+
+            # don't repeat the next step of paths which share this root,
+            # and don't revisit the nodes already on the root
+            blocked_edges = {p[i + 1] for _, p in found if p[: i + 1] == root}
+            blocked_nodes = set(root[:-1])
+
+            def spur_edges(
+                node, spur=spur, blocked_edges=blocked_edges, blocked_nodes=blocked_nodes
+            ):
+                for neighbour, cost in edges(node):
+                    if neighbour in blocked_nodes:
+                        continue
+                    if node == spur and neighbour in blocked_edges:
+                        continue
+                    yield neighbour, cost
+
+            spur_cost, spur_path = cheapest_path(spur, end, spur_edges)
+            if spur_path:
+                candidate = root[:-1] + spur_path
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    heappush(candidates, (root_cost + spur_cost, next(counter), candidate))
+
+            root_cost += edge_cost(previous[i], previous[i + 1])
+
+        if not candidates:
+            break
+        cost, _, path = heappop(candidates)
+        found.append((cost, path))
+
+    return found
+
+
+def topological_generations(nodes, successors: Callable, in_degree: Callable) -> List[List]:
+    """
+    Group the nodes into generations, every edge goes from a node in an
+    earlier generation to a node in a later one.
+
+    This is Kahn's algorithm, each node's count of incoming edges is reduced
+    as the nodes before it are placed, so every edge is visited once.
+
+    Parameters:
+        nodes: Iterable
+            Every node in the graph
+        successors: Callable
+            Returns the nodes reachable by an edge from a given node, once for
+            each edge
+        in_degree: Callable
+            Returns the number of edges to a given node
+
+    Returns:
+        List of generations, each a list of nodes
+
+    Raises:
+        CyclicGraphError: the graph contains a cycle
+    """
+    remaining = {}
+    generation = []
+    for node in nodes:
+        degree = in_degree(node)
+        if degree:
+            remaining[node] = degree
+        else:
+            generation.append(node)
+
+    generations = []
+    while generation:
+        generations.append(generation)
+        next_generation = []
+        for node in generation:
+            for neighbour in successors(node):
+                remaining[neighbour] -= 1
+                if not remaining[neighbour]:
+                    del remaining[neighbour]
+                    next_generation.append(neighbour)
+        generation = next_generation
+
+    if remaining:
+        raise CyclicGraphError("The graph contains at least one cycle")
+    return generations
@@ -0,0 +1,200 @@
+"""
+travers
+
+(C) 2023 Justin Joyce.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from array import array
+from typing import Callable
+
+from travers.errors import MissingDependencyError
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+def _as_numpy(buffer):
+    """internal helper method, a numpy view of an array or memoryview, without copying"""
+    typecode = buffer.typecode if isinstance(buffer, array) else buffer.format
+    return numpy.frombuffer(buffer, dtype=typecode)
+
+
+class VectorEngine:
+    """
+    NumPy views of a CompactGraph's adjacency arrays, and the node attributes
+    encoded as columns, shared by every step of a vectorised traversal.
+
+    Attribute columns are built the first time a key is filtered on; each
+    value is replaced by an integer code, nodes without the key have a code
+    of -1.
+    """
+
+    __slots__ = ("graph", "out_offsets", "out_targets", "out_relationships", "_columns")
+
+    def __init__(self, graph):
+        if numpy is None:  # pragma: no cover
+            raise MissingDependencyError("numpy")
+        self.graph = graph
+        self.out_offsets = _as_numpy(graph._out_offsets)
+        self.out_targets = _as_numpy(graph._out_targets)
+        self.out_relationships = _as_numpy(graph._out_relationships)
+        self._columns: dict = {}
+
+    def column(self, key):
+        """the codes of an attribute for every node, the values and the (type, value) to code lookup"""
+        if key not in self._columns:
+            codes = numpy.full(len(self.graph._nids), -1, dtype=numpy.int64)
+            values: list = []
+            value_index: dict = {}
+            for i, attributes in enumerate(self.graph._attributes[: len(self.graph._nids)]):
+                if isinstance(attributes, dict) and key in attributes:
+                    value = attributes[key]
+                    try:
+                        # values of different types are not merged, even if they are equal
+                        code = value_index.setdefault((type(value), value), len(values))
+                    except TypeError:
+                        # values which can't be hashed each have a code of their own
+                        code = len(values)
+                    if code == len(values):
+                        values.append(value)
+                    codes[i] = code
+            self._columns[key] = (codes, values, value_index)
+        return self._columns[key]
+
+    def edge_positions(self, active):
+        """the positions, in the CSR arrays, of every outgoing edge of the active nodes"""
+        starts = self.out_offsets[active]
+        lengths = self.out_offsets[active + 1] - starts
+        # each row's edges are at its start plus 0 to its length
+        row_starts = numpy.cumsum(lengths) - lengths
+        return numpy.repeat(starts - row_starts, lengths) + numpy.arange(lengths.sum())
+
+
+class VectorTraversal:
+    """
+    Graph Traversal over a CompactGraph using NumPy, the active nodes are held
+    as an array of interned node IDs and each step is computed with array
+    operations rather than a Python loop per node and edge.
+    """
+
+    __slots__ = ("engine", "_active")
+
+    def __init__(self, engine: VectorEngine, active=None):
+        """
+        Vectorised Graph Traversal
+
+        Parameters:
+            engine: VectorEngine
+            active: numpy array of interned node IDs
+        """
+        self.engine = engine
+        if active is None:
+            active = numpy.empty(0, dtype=numpy.int64)
+        self._active = active
+
+    @classmethod
+    def from_indexes(cls, engine: VectorEngine, indexes):
+        """
+        Start a traversal from a list of interned node IDs.
+        """
+        return cls(engine, numpy.unique(numpy.array(indexes, dtype=numpy.int64)))
+
+    @property
+    def graph(self):
+        return self.engine.graph
+
+    def follow(self, *relationships):
+        """
+        Traverses a graph by following edges from the active nodes with
+        a relationship on the list of relationships.
+
+        Parameters:
+            relationsips: strings
+                traverses node following edges with the stated relationship
+
+        Returns:
+            VectorTraversal
+        """
+        label_index = self.graph._label_index
+        codes = [label_index[r] for r in relationships if r in label_index]
+        if not codes or not len(self._active):
+            return VectorTraversal(self.engine)
+
+        engine = self.engine
+        positions = engine.edge_positions(self._active)
+        matches = positions[numpy.isin(engine.out_relationships[positions], codes)]
+        return VectorTraversal(engine, numpy.unique(engine.out_targets[matches]))
+
+    def select(self, filter: Callable):
+        """
+        Filters the active nodes by a function, the function is called for
+        each active node so this step is not vectorised.
+
+        Parameters:
+            filter: Callable
+                node attribute name to filter on
+
+        Returns:
+            VectorTraversal
+        """
+        attributes = self.graph._attributes
+        mask = numpy.fromiter(
+            (filter(attributes[i]) for i in self._active.tolist()),
+            dtype=bool,
+            count=len(self._active),
+        )
+        return VectorTraversal(self.engine, self._active[mask])
+
+    def has(self, key, value):
+        """
+        Filters the active nodes by a key/value match
+        """
+        codes, values, _ = self.engine.column(key)
+        # match equal values of any type, as a dictionary lookup would
+        matches = [code for code, found in enumerate(values) if found == value]
+        # nodes without the attribute match None
+        if value is None:
+            matches.append(-1)
+        if not matches:
+            return VectorTraversal(self.engine)
+        return VectorTraversal(self.engine, self._active[numpy.isin(codes[self._active], matches)])
+
+    def values(self, key):
+        codes, values, _ = self.engine.column(key)
+        found = numpy.unique(codes[self._active])
+        # equal values of different types have different codes, but are one value
+        return list(dict.fromkeys(values[code] for code in found.tolist() if code >= 0))
+
+    def active_nodes(self, data=False):
+        nids = self.graph._nids
+        if not data:
+            return {nids[i] for i in self._active.tolist()}
+        attributes = self.graph._attributes
+        return [(nids[i], attributes[i]) for i in self._active.tolist()]
+
+    def list_relationships(self):
+        if not len(self._active):
+            return set()
+        engine = self.engine
+        codes = numpy.unique(engine.out_relationships[engine.edge_positions(self._active)])
+        return {self.graph._labels[code] for code in codes.tolist()}
+
+    def __repr__(self):  # pragma: no-cover
+        return f"{self.graph!r} ({len(self._active)} selected)"
+
+    def __len__(self):  # pragma: no-cover
+        return len(self._active)
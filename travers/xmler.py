@@ -63,3 +63,37 @@ def parse(xml_string):
     dictionary = _etree_to_dict(tree)
     _strip_namespace(dictionary)
     return dictionary
+
+
+def _local_name(tag):
+    """remove the namespace from a tag"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iterparse(source, tags):
+    """
+    Stream the elements with the given tags from an XML document.
+
+    Elements are yielded, as a tuple of the tag (with the namespace removed)
+    and the element, once they have been completely read. After they have been
+    yielded they, and their preceding siblings, are discarded so memory use
+    does not grow with the size of the document.
+
+    Parameters:
+        source: string or file
+            The XML document to parse
+        tags: set of strings
+            The tags, without namespaces, of the elements to yield
+    """
+    parents = []
+    for event, element in ElementTree.iterparse(source, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        tag = _local_name(element.tag)
+        if tag in tags:
+            yield tag, element
+            element.clear()
+            if parents:
+                del parents[-1][:]